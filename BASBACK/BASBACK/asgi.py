@@ -3,6 +3,10 @@ ASGI config for BASBACK project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The /login/ view is async, so serving through this module (e.g. with
+``uvicorn BASBACK.asgi:application``) lets one worker process keep many
+upstream logins in flight at once.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
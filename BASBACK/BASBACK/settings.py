@@ -10,11 +10,17 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# 仓库根目录下的 syllabus 包(课表抓取与日历生成的核心流程)
+REPO_DIR = BASE_DIR.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.insert(0, str(REPO_DIR))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
@@ -37,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'backend',
 ]
 
 MIDDLEWARE = [
@@ -82,6 +89,47 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# /login/ 生成的日历按 (学号, 密码, 学期, 解析版本) 缓存；LocMemCache 按最近使用淘汰，条目数由 MAX_ENTRIES 限制
+SYLLABUS_CACHE_TIMEOUT = 600  # 秒，0 表示不缓存
+
+# 访问教务系统的限速、并发上限、重试与熔断参数(见 syllabus.upstream.UpstreamClient)，状态可在 /upstream/ 查看
+SYLLABUS_UPSTREAM = {
+    'rate': 5.0,  # 每秒请求数
+    'burst': 10,
+    'max_concurrency': 16,
+    'retries': 2,
+    'timeout': 15.0,
+    'failure_threshold': 5,
+    'reset_timeout': 30.0,
+}
+
+# 教务系统不可用时，返回不超过这么久(秒)之前生成的旧日历
+SYLLABUS_STALE_TIMEOUT = 86400
+
+# 后台任务(/jobs/)的线程数与结果保留时间(秒)
+SYLLABUS_JOB_WORKERS = 4
+SYLLABUS_JOB_TTL = 3600
+# 排队中/生成中超过这么久(秒)没有进展的任务视为失败(例如所在进程已重启)
+SYLLABUS_JOB_TIMEOUT = 300
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'syllabus': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'syllabus',
+        'TIMEOUT': SYLLABUS_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -18,5 +18,8 @@ from django.urls import path
 from backend import views
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('login/',views.login)
+    path('login/',views.login),
+    path('jobs/', views.submit_job),
+    path('jobs/<uuid:job_id>/', views.job_status),
+    path('upstream/', views.upstream_status),
 ]
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
 # Register your models here.
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'error', 'created_at', 'updated_at')
+    list_filter = ('status',)
+    exclude = ('result',)
@@ -0,0 +1,69 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+import syllabus
+from .models import Job
+from .services import generate_calendar
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+  """进程内的后台线程池，并发数由 SYLLABUS_JOB_WORKERS 决定，不依赖外部消息队列。"""
+  global _executor
+  with _executor_lock:
+    if _executor is None:
+      _executor = ThreadPoolExecutor(max_workers=settings.SYLLABUS_JOB_WORKERS, thread_name_prefix='syllabus-job')
+    return _executor
+
+
+STALE_ERROR = '任务超时或后端已重启，请重新提交'
+
+
+def fail_stale(jobs=None):
+  """把长时间停在排队中/生成中的任务标记为失败；线程池在进程内，进程重启后这些任务不会再有进展。"""
+  cutoff = timezone.now() - datetime.timedelta(seconds=settings.SYLLABUS_JOB_TIMEOUT)
+  jobs = Job.objects.all() if jobs is None else jobs
+  return jobs.filter(status__in=(Job.PENDING, Job.RUNNING), updated_at__lt=cutoff).update(
+    status=Job.FAILED, error=STALE_ERROR, updated_at=timezone.now())
+
+
+def purge_expired():
+  cutoff = timezone.now() - datetime.timedelta(seconds=settings.SYLLABUS_JOB_TTL)
+  Job.objects.filter(created_at__lt=cutoff).delete()
+  fail_stale()
+
+
+def submit(BUPT_ID, BUPT_PASS, options, compact):
+  """创建任务并放入线程池，立即返回 Job；账号密码只在内存中传给工作线程，不写入数据库。"""
+  purge_expired()
+  job = Job.objects.create()
+  executor().submit(run_job, job.pk, BUPT_ID, BUPT_PASS, options, compact)
+  return job
+
+
+def run_job(pk, BUPT_ID, BUPT_PASS, options, compact):
+  try:
+    # 排队太久已被 fail_stale 判为失败的任务不再执行
+    if not Job.objects.filter(pk=pk, status=Job.PENDING).update(status=Job.RUNNING, updated_at=timezone.now()):
+      return
+    try:
+      result = generate_calendar(BUPT_ID, BUPT_PASS, options, compact)
+    except syllabus.LoginError:
+      Job.objects.filter(pk=pk).update(status=Job.FAILED, error='密码错误', updated_at=timezone.now())
+    except syllabus.UpstreamUnavailable:
+      Job.objects.filter(pk=pk).update(status=Job.FAILED, error='教务系统暂时不可用，请稍后再试', updated_at=timezone.now())
+    except syllabus.SheetFormatError:
+      Job.objects.filter(pk=pk).update(status=Job.FAILED, error='无法识别教务系统返回的课表', updated_at=timezone.now())
+    except Exception as e:
+      Job.objects.filter(pk=pk).update(status=Job.FAILED, error=f'{type(e).__name__}: {e}'[:200], updated_at=timezone.now())
+    else:
+      Job.objects.filter(pk=pk).update(status=Job.DONE, result=result, updated_at=timezone.now())
+  finally:
+    close_old_connections()
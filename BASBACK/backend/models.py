@@ -1,3 +1,26 @@
+import uuid
+
 from django.db import models
 
 # Create your models here.
+
+
+class Job(models.Model):
+  """后台生成课表日历的任务；状态存在数据库里，任意一个后端进程都能查询。"""
+  PENDING = 'pending'
+  RUNNING = 'running'
+  DONE = 'done'
+  FAILED = 'failed'
+  STATUS_CHOICES = [
+    (PENDING, '排队中'),
+    (RUNNING, '生成中'),
+    (DONE, '已完成'),
+    (FAILED, '失败'),
+  ]
+
+  id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+  status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+  result = models.TextField(blank=True, default='')
+  error = models.CharField(max_length=200, blank=True, default='')
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
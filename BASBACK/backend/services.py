@@ -0,0 +1,59 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+import syllabus
+
+
+def fetch_lessons(BUPT_ID, BUPT_PASS, options):
+  # 阻塞的上游请求；session 的底层连接池在进程内共享(见 syllabus.client.new_session)
+  session = syllabus.login(BUPT_ID, BUPT_PASS)
+  content = syllabus.fetch_timetable(session, options.xueqi)
+  ws = syllabus.load_sheet(content)
+  return syllabus.parse_lessons(ws, options.combine)
+
+
+def cache_key(BUPT_ID, BUPT_PASS, options, compact):
+  # 密码也参与哈希：输错密码不会命中别人的缓存，缓存里也不保存明文账号密码
+  parts = [BUPT_ID, BUPT_PASS, options.xueqi, options.term_start_date.isoformat(), str(options.combine), str(compact), str(options.skip_holidays), str(syllabus.PARSER_VERSION)]
+  return 'login:' + hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def stale_key(key):
+  return key + ':stale'
+
+
+def remember(key, result):
+  caches['syllabus'].set(key, result)
+  caches['syllabus'].set(stale_key(key), result, settings.SYLLABUS_STALE_TIMEOUT)
+
+
+async def aremember(key, result):
+  await caches['syllabus'].aset(key, result)
+  await caches['syllabus'].aset(stale_key(key), result, settings.SYLLABUS_STALE_TIMEOUT)
+
+
+def generate_calendar(BUPT_ID, BUPT_PASS, options, compact):
+  """同步生成完整的 data URI 日历链接(后台任务使用)，命中缓存时不访问教务系统。
+
+  教务系统不可用(syllabus.UpstreamUnavailable)时返回最近一次的旧结果，没有旧结果才向上抛出。
+  """
+  key = cache_key(BUPT_ID, BUPT_PASS, options, compact) if settings.SYLLABUS_CACHE_TIMEOUT else None
+  if key is not None:
+    cached = caches['syllabus'].get(key)
+    if cached is not None:
+      return cached
+
+  try:
+    lessons = fetch_lessons(BUPT_ID, BUPT_PASS, options)
+  except syllabus.UpstreamUnavailable:
+    stale = caches['syllabus'].get(stale_key(key)) if key is not None else None
+    if stale is None:
+      raise
+    return stale
+  events = syllabus.iter_events(lessons, options.term_start_date, options.skip_holidays)
+  result = syllabus.direct_link(events, compact)
+  if key is not None:
+    remember(key, result)
+  return result
@@ -1,3 +1,40 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+import syllabus
+from . import jobs
+from .models import Job
+
+
+@override_settings(SYLLABUS_JOB_TIMEOUT=60)
+class StaleJobTests(TestCase):
+  def make_job(self, status, age):
+    job = Job.objects.create(status=status)
+    Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - datetime.timedelta(seconds=age))
+    return job
+
+  def test_stuck_jobs_are_failed(self):
+    stuck = [self.make_job(Job.PENDING, 120), self.make_job(Job.RUNNING, 120)]
+    fresh = self.make_job(Job.RUNNING, 10)
+    done = self.make_job(Job.DONE, 120)
+    self.assertEqual(jobs.fail_stale(), 2)
+    for job in stuck:
+      job.refresh_from_db()
+      self.assertEqual((job.status, job.error), (Job.FAILED, jobs.STALE_ERROR))
+    fresh.refresh_from_db()
+    done.refresh_from_db()
+    self.assertEqual((fresh.status, done.status), (Job.RUNNING, Job.DONE))
+
+  def test_status_view_reports_stuck_job_as_failed(self):
+    job = self.make_job(Job.RUNNING, 120)
+    data = self.client.get(f'/jobs/{job.pk}/').json()
+    self.assertEqual(data['status'], Job.FAILED)
+
+  def test_failed_job_is_not_run(self):
+    job = self.make_job(Job.PENDING, 120)
+    jobs.fail_stale()
+    jobs.run_job(job.pk, 'u', 'p', syllabus.load_options(), False)
+    job.refresh_from_db()
+    self.assertEqual(job.status, Job.FAILED)
@@ -1,252 +1,108 @@
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
-import xlrd
-import random
-import string
-import re
-import datetime
-import math
-import requests
-import time
-import os
-import math
-import platform
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+import syllabus
+from . import jobs
+from .models import Job
+from .services import aremember, cache_key, fetch_lessons, remember, stale_key
 # Create your views here.
 
 
-def login(request):
-  # 高级设置
-  year = '2022' # 年份
-  xueqi = '2021-2022-2' # 学期数
-  begin_week = 9 # 开学的当周，苹果日历中查看，打开设置中的周数
-  year_week = 52 # 今年总周数
-  Combine_Trigger = True # 连着几节的课程是否合并
+async def stream_chunks(chunks, key=None):
+  parts = []
+  for chunk in chunks:
+    if key is not None:
+      parts.append(chunk)
+    yield chunk
+  if key is not None:
+    await aremember(key, ''.join(parts))
+
+
+def iter_chunks(chunks, key=None):
+  # WSGI(BAS.ini 的 uwsgi)下使用的同步版本：Django 会把异步迭代器整体缓冲后再发送，还会逐请求告警
+  parts = []
+  for chunk in chunks:
+    if key is not None:
+      parts.append(chunk)
+    yield chunk
+  if key is not None:
+    remember(key, ''.join(parts))
+
+
+async def login(request):
+  options = syllabus.load_options()
   BUPT_ID = request.GET.get('id', '')
   BUPT_PASS = request.GET.get('pw', '')
-  keyStr = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=' # DO NOT CHANGE!!!
-  def encodeInp(input):
-    output = ''
-    chr1, chr2, chr3 = '', '', ''
-    enc1, enc2, enc3 = '', '', ''
-    i = 0
-    while True:
-      chr1 = ord(input[i])
-      i += 1
-      chr2 = ord(input[i]) if i < len(input) else 0
-      i += 1
-      chr3 = ord(input[i]) if i < len(input) else 0
-      i += 1
-      enc1 = chr1 >> 2
-      enc2 = ((chr1 & 3) << 4) | (chr2 >> 4)
-      enc3 = ((chr2 & 15) << 2) | (chr3 >> 6)
-      enc4 = chr3 & 63
-      # print(chr1, chr2, chr3)
-      if chr2 == 0:
-        enc3 = enc4 = 64
-      elif chr3 == 0:
-        enc4 = 64
-      output = output + keyStr[enc1] + keyStr[enc2] + keyStr[enc3] + keyStr[enc4]
-      chr1 = chr2 = chr3 = ''
-      enc1 = enc2 = enc3 = enc4 = ''
-      if i >= len(input):
-        break
-    return output
-
-
-  encoded = encodeInp(BUPT_ID) + '%%%' + encodeInp(BUPT_PASS)
-
-  session = requests.session()
-
-  l1 = session.get('https://jwgl.bupt.edu.cn/jsxsd/')
-  cookies1 = l1.cookies.items()
-  cookie = ''
-  for name, value in cookies1:
-    cookie += '{0}={1}; '.format(name, value)
-
-  # 第二次请求，发送cookie和密码
-  # print(cookie)
-  headers = {
-      'Host': 'jwgl.bupt.edu.cn',
-      'Referer': 'https://jwgl.bupt.edu.cn/jsxsd/xk/LoginToXk?method=exit&tktime=1631723647000',
-      'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.82 Safari/537.36',
-      "cookie": cookie
-  }
-  payload = {'userAccount': BUPT_ID, 'userPassWord': '', 'encoded': encoded}
-  l5 = session.post('https://jwgl.bupt.edu.cn/jsxsd/xk/LoginToXk',
-                    data=payload, headers=headers)
-
-  # 第三次请求带上cookie
-  cookies1 = l1.cookies.items()
-  cookie = ''
-  for name, value in cookies1:
-    cookie += '{0}={1}; '.format(name, value)
-  headers = {
-      "cookie": cookie
-  }
-  data = {'xnxq01id': xueqi, 'zc': '',
-          'kbjcmsid': '9475847A3F3033D1E05377B5030AA94D'}
-  url = 'https://jwgl.bupt.edu.cn/jsxsd/xskb/xskb_print.do?xnxq01id={}&zc=&kbjcmsid=9475847A3F3033D1E05377B5030AA94D'.format(
-      xueqi)
-  p = requests.post(url, data=data, headers=headers)
-  f=open('a.xls','wb')
-  f.write(p.content)
-  class lesson:
-    name = ''
-    week = ''
-    place = ''
-    section = ''
-    time = ''
-
-  wb = xlrd.open_workbook("./a.xls")
-  ws = wb.sheet_by_index(0)
-  nrows = ws.nrows
-  ncols = ws.ncols
-
-  col_values = ws.col_values(colx=0)
-  realtime_list = col_values[3:17]
-  realtime_list = [time.split('\n')[1] for time in realtime_list]
-  all_lesson = []
-  os.remove("./a.xls")
-  # list(realtime_list)
-  # print(realtime_list)
-  for col in range(1,6):
-    for row in range(3,17):
-      cell_info = ws.cell_value(rowx=row, colx=col)
-      if cell_info != ' ' and 0<row<17:
-        cells_list = []
-        cells = cell_info.splitlines()[1:]
-        # 体育课有六项
-        if len(cells) == 6:
-          cells = cells[1:]
-          # 去掉括号
-          cells[0] = cells[0][1:-1]
-          cells_list.append(cells)
-        # 两种课程写一起了
-        elif len(cells) == 10:
-          cells1 = cells[5:]
-          cells2 = cells[:5]
-          cells_list.append(cells1)
-          cells_list.append(cells2)
-        elif len(cells) == 11 and '节' in cells[5]:
-          cells1 = cells[6:]
-          cells2 = cells[:6]
-          cells2 = cells2[1:]
-          # 去掉括号
-          cells2[0] = cells2[0][1:-1]
-          cells_list.append(cells1)
-          cells_list.append(cells2)
-        elif len(cells) == 11 and '节' not in cells[5]:
-          cells1 = cells[5:]
-          cells2 = cells[:5]
-          cells1 = cells1[1:]
-          # 去掉括号
-          cells1[0] = cells1[0][1:-1]
-          cells_list.append(cells1)
-          cells_list.append(cells2)
-        else:
-          cells_list.append(cells)
-        for c in cells_list:
-          lec1 =lesson()
-          lec1.name = c[0]
-          lec1.week = c[-3]
-          lec1.place = c[-2]
-          lec1.section = c[-1]
-          lec1.time = realtime_list[row-3] + '+' +str(col)
-          all_lesson.append(lec1.__dict__)
-          # print(lec1.__dict__)
-      if Combine_Trigger and cell_info != ' ' and 3 < row and cell_info == ws.cell_value(rowx=row-1, colx=col):
-        all_lesson.pop()
-        tmplesson = all_lesson.pop()
-        tmplesson['time'] = tmplesson['time'].split('-')[0] + '-' +realtime_list[row-3].split('-')[1] + '+' + str(col)
-        all_lesson.append(tmplesson)
-  # print(len(all_lesson))
-  # print(all_lesson)
-
-  # 写入头文件
-
-  head=['BEGIN:VCALENDAR',
-  'VERSION:2.0',
-  ]
-  def randomUID():
-    return ''.join(random.sample(['z','y','x','w','v','u','t','s','r','q','p','o','n','m','l','k','j','i','h','g','f','e','d','c','b','a'], 15))
-
-  res_txt = 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
-
-  def write_file(name, place, date, time_start, time_end):
-    nonlocal res_txt
-    res_txt += 'BEGIN:VEVENT'
-    res_txt += '\r\n'
-    res_txt += 'DTSTAMP:20201012T104622Z'
-    res_txt += '\r\n'
-    res_txt += 'UID:' + randomUID()
-    res_txt += '\r\n'
-    res_txt += 'SUMMARY:{} {}'.format(name,place)
-    res_txt += '\r\n'
-    res_txt += 'DTSTART;TZID=Asia/Shanghai:{}T{}'.format(date, time_start)
-    res_txt += '\r\n'
-    res_txt += 'DTEND;TZID=Asia/Shanghai:{}T{}'.format(date, time_end)
-    res_txt += '\r\n'
-    res_txt += 'BEGIN:VALARM'
-    res_txt += '\r\n'
-    res_txt += 'X-WR-ALARMUID:F03864BD-41F4-40EC-BF20-1E4E7930ED92'
-    res_txt += '\r\n'
-    res_txt += 'UID:' + randomUID()
-    res_txt += '\r\n'
-    res_txt += 'TRIGGER:-PT5M'
-    res_txt += '\r\n'
-    res_txt += 'ATTACH;VALUE=URI:Chord'
-    res_txt += '\r\n'
-    res_txt += 'ACTION:AUDIO'
-    res_txt += '\r\n'
-    res_txt += 'END:VALARM'
-    res_txt += '\r\n'
-    res_txt += 'END:VEVENT'
-    res_txt += '\r\n'
-    # print(res_txt)
-
-  for l in all_lesson:
-    # print(l['name'])
-    name = l['name']
-    week = l['week']
-    week_all = week[:-3].split(',')
-    place = l['place']
-    time = l['time']
-    time_all = time.split('+')[0]
-    time_start = ''.join(time_all.split('-')[0].split(':')) + '00'
-    time_end = ''.join(time_all.split('-')[1].split(':')) + '00'
-    time_seven = time.split('+')[1]
-    date = []
-    # print(week_all)
-    for week_item in week_all:
-      # if len(week_item) == 1:
-      #   print(week_item)
-      #   week_item_begin = week_item
-      #   week_item_end = week_item
-      if not '-' in week_item:
-        d = year + '-W' + str(int(week_item)+begin_week-1) + '-' + str(time_seven)
-        r = datetime.datetime.strptime(d, "%Y-W%W-%w")
-        date = r.strftime('%Y%m%d')
-        # print(name, place, date, time_start, time_end)
-        write_file(name, place, date, time_start, time_end)
-      else:
-        week_item_begin = week_item.split('-')[0]
-        week_item_end = week_item.split('-')[1]
-        # print(week_item_begin, week_item_end)
-        for week_iter in range(int(week_item_begin)+begin_week-1, int(week_item_end)+begin_week):
-          d = year + '-W' + str(week_iter) + '-' + str(time_seven)
-          r = datetime.datetime.strptime(d, "%Y-W%W-%w")
-          date = r.strftime('%Y%m%d')
-          # print(name, place, date, time_start, time_end)
-          write_file(name, place, date, time_start, time_end)
-        # date.append(a)
-        # print(name,place,date,time_start,time_end)
-
-  res_txt += 'END:VCALENDAR'
-
-
-  import urllib.parse
-
-  res_txt = urllib.parse.quote(res_txt, safe='~@#$&()*!+=:;,.?/\'')
-  #使用二进制格式保存转码后的文本
-  res_txt = 'data:text/calendar,' + res_txt
-  return HttpResponse(res_txt)
+  if not BUPT_ID or not BUPT_PASS:
+    return HttpResponse('请填入学号和密码', status=400)
+
+  compact = request.GET.get('compact', '1' if options.compact_ics else '') == '1'
+  key = None
+  if settings.SYLLABUS_CACHE_TIMEOUT:
+    key = cache_key(BUPT_ID, BUPT_PASS, options, compact)
+    cached = await caches['syllabus'].aget(key)
+    if cached is not None:
+      return HttpResponse(cached)
+
+  try:
+    lessons = await sync_to_async(fetch_lessons, thread_sensitive=False)(BUPT_ID, BUPT_PASS, options)
+  except syllabus.LoginError:
+    return HttpResponse('密码错误', status=401)
+  except syllabus.SheetFormatError:
+    return HttpResponse('无法识别教务系统返回的课表', status=502)
+  except syllabus.UpstreamUnavailable:
+    # 教务系统不可用时快速失败，有旧结果就先返回旧结果
+    stale = await caches['syllabus'].aget(stale_key(key)) if key is not None else None
+    if stale is None:
+      return HttpResponse('教务系统暂时不可用，请稍后再试', status=503)
+    return HttpResponse(stale)
+
+  # 边生成边发送，内存占用不随事件数增长
+  events = syllabus.iter_events(lessons, options.term_start_date, options.skip_holidays)
+  chunks = syllabus.iter_direct_link(events, compact)
+  if isinstance(request, ASGIRequest):
+    return StreamingHttpResponse(stream_chunks(chunks, key))
+  return StreamingHttpResponse(iter_chunks(chunks, key))
+
+
+@csrf_exempt
+@require_POST
+def submit_job(request):
+  """提交生成任务，立即返回 job_id；前端随后轮询 job_status。"""
+  options = syllabus.load_options()
+  BUPT_ID = request.POST.get('id', '')
+  BUPT_PASS = request.POST.get('pw', '')
+  if not BUPT_ID or not BUPT_PASS:
+    return JsonResponse({'error': '请填入学号和密码'}, status=400)
+
+  compact = request.POST.get('compact', '1' if options.compact_ics else '') == '1'
+  job = jobs.submit(BUPT_ID, BUPT_PASS, options, compact)
+  return JsonResponse({'job_id': str(job.pk), 'status': job.status}, status=202)
+
+
+@require_GET
+def job_status(request, job_id):
+  jobs.fail_stale(Job.objects.filter(pk=job_id))
+  try:
+    job = Job.objects.get(pk=job_id)
+  except Job.DoesNotExist:
+    raise Http404('任务不存在或已过期')
+
+  data = {'job_id': str(job.pk), 'status': job.status}
+  if job.status == Job.DONE:
+    data['result'] = job.result
+  elif job.status == Job.FAILED:
+    data['error'] = job.error
+  return JsonResponse(data)
+
+
+@require_GET
+def upstream_status(request):
+  """教务系统访问层的熔断、限速与并发状态，供监控使用。"""
+  return JsonResponse(syllabus.upstream.status())
@@ -0,0 +1,292 @@
+"""流水线各阶段的基准测试，在合成课表(benchmarks.fixtures)上运行，规模可调，结果可保存为基线并对比。
+
+    python -m benchmarks.bench                                   # 默认规模，打印结果
+    python -m benchmarks.bench --students 20 --courses-per-cell 3 --weeks 20 --sections 14
+    python -m benchmarks.bench --save default                    # 写入 benchmarks/baselines/default.json
+    python -m benchmarks.bench --compare benchmarks/baselines/default.json --threshold 1.3
+
+对比时任何一项比基线慢 threshold 倍以上即以退出码 1 结束，可直接用于 CI。
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import syllabus
+from syllabus import chart
+from syllabus import parser as timetable_parser
+
+from . import fixtures
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+BASELINE_VERSION = 1
+TERM_START = datetime.date(2026, 3, 2)
+
+
+class Workload:
+    """一次基准运行用到的全部输入，按阶段逐步准备好，各用例只计时自己那一段。"""
+
+    def __init__(self, args):
+        self.args = args
+        self.contents = [
+            fixtures.make_xls_bytes(
+                seed=i, courses=args.courses, weeks=args.weeks, sections=args.sections, weekdays=args.weekdays,
+                courses_per_cell=args.courses_per_cell, span=args.span)
+            for i in range(args.students)
+        ]
+        self.sheets = [syllabus.load_sheet(content) for content in self.contents]
+        self.cell_texts = [text for ws in self.sheets for _col, _row, _end, text in syllabus.iter_cell_blocks(ws, True)]
+        self.lessons = [syllabus.parse_lessons(ws, True) for ws in self.sheets]
+        self.week_strings = [lesson['week'] for lessons in self.lessons for lesson in lessons]
+        self.events = [syllabus.build_events(lessons, TERM_START) for lessons in self.lessons]
+        self._grids = None
+
+    @property
+    def grids(self):
+        if self._grids is None:
+            import generate_weekly_image
+            self._grids = []
+            for events in self.events:
+                _weekdays, sections, per_week = generate_weekly_image.build_grid(
+                    generate_weekly_image.to_image_events(events))
+                self._grids.append((sections, per_week))
+        return self._grids
+
+    @property
+    def size(self):
+        return {
+            'students': len(self.contents),
+            'xls_bytes': sum(len(c) for c in self.contents),
+            'cells': len(self.cell_texts),
+            'lessons': sum(len(l) for l in self.lessons),
+            'events': sum(len(e) for e in self.events),
+        }
+
+
+def case_load_sheet(w):
+    for content in w.contents:
+        syllabus.load_sheet(content)
+
+
+def case_parse_cell_courses(w):
+    timetable_parser.clear_caches()
+    for text in w.cell_texts:
+        syllabus.parse_cell_courses(text)
+
+
+def case_expand_week_numbers(w):
+    timetable_parser.clear_caches()
+    for week in w.week_strings:
+        syllabus.expand_week_numbers(week)
+
+
+def case_combine_scan(w):
+    for ws in w.sheets:
+        for _block in syllabus.iter_cell_blocks(ws, True):
+            pass
+
+
+def case_parse_lessons(w):
+    timetable_parser.clear_caches()
+    for ws in w.sheets:
+        syllabus.parse_lessons(ws, True)
+
+
+def case_build_events(w):
+    for lessons in w.lessons:
+        syllabus.build_events(lessons, TERM_START)
+
+
+def case_ics(w):
+    for events in w.events:
+        ''.join(syllabus.iter_ics(events))
+
+
+def case_ics_compact(w):
+    for events in w.events:
+        ''.join(syllabus.iter_ics(events, compact=True))
+
+
+def case_write_16week_chart(w):
+    with tempfile.TemporaryDirectory() as tmp:
+        for events in w.events:
+            syllabus.write_16week_chart(events, Path(tmp) / 'chart.md', Path(tmp) / 'chart.csv')
+
+
+def case_build_grid(w):
+    import generate_weekly_image
+    for events in w.events:
+        generate_weekly_image.build_grid(generate_weekly_image.to_image_events(events))
+
+
+def case_render_pillow(w):
+    from syllabus import raster
+    for sections, per_week in w.grids:
+        raster.render_weeks(sections, per_week, TERM_START, dpi=w.args.dpi)
+
+
+def case_render_template(w):
+    from syllabus import raster
+    all_sections = sorted({sec for sections, _ in w.grids for sec in sections}, key=syllabus.section_sort_key)
+    template = raster.TermTemplate(TERM_START, dpi=w.args.dpi, sections=all_sections)
+    for _sections, per_week in w.grids:
+        template.render(all_sections, per_week)
+
+
+def case_render_svg(w):
+    for sections, per_week in w.grids:
+        ''.join(syllabus.iter_svg(sections, per_week, TERM_START))
+
+
+def case_render_matplotlib(w):
+    import generate_weekly_image
+    with tempfile.TemporaryDirectory() as tmp:
+        for sections, per_week in w.grids:
+            generate_weekly_image.draw_vertical_weeks(
+                chart.WEEKDAY_NAMES, sections, per_week, Path(tmp) / 'week.png', dpi=w.args.dpi)
+
+
+CASES = {
+    'load_sheet': case_load_sheet,
+    'parse_cell_courses': case_parse_cell_courses,
+    'expand_week_numbers': case_expand_week_numbers,
+    'combine_scan': case_combine_scan,
+    'parse_lessons': case_parse_lessons,
+    'build_events': case_build_events,
+    'ics': case_ics,
+    'ics_compact': case_ics_compact,
+    'write_16week_chart': case_write_16week_chart,
+    'build_grid': case_build_grid,
+    'render_pillow': case_render_pillow,
+    'render_template': case_render_template,
+    'render_svg': case_render_svg,
+    'render_matplotlib': case_render_matplotlib,
+}
+SLOW_CASES = {'render_matplotlib'}  # 默认不跑，用 --cases 显式指定
+PILLOW_CASES = {'render_pillow', 'render_template'}
+
+
+def time_case(fn, workload, repeat):
+    fn(workload)  # 预热：导入模块、建立字体等一次性开销不计入
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(workload)
+        samples.append(time.perf_counter() - start)
+    return {
+        'min_ms': round(min(samples) * 1000, 3),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'repeat': repeat,
+    }
+
+
+def git_revision():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def run(args):
+    names = args.cases.split(',') if args.cases else [n for n in CASES if n not in SLOW_CASES]
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise SystemExit(f'未知的用例: {", ".join(unknown)}，可选: {", ".join(CASES)}')
+    try:
+        from syllabus import raster
+        raster.require_pillow()
+        has_pillow = True
+    except RuntimeError:
+        has_pillow = False
+
+    workload = Workload(args)
+    results = {}
+    for name in names:
+        if name in PILLOW_CASES and not has_pillow:
+            results[name] = {'skipped': 'Pillow 未安装'}
+            continue
+        results[name] = time_case(CASES[name], workload, args.repeat)
+        print(f'{name:<22} min {results[name]["min_ms"]:>10.2f} ms   median {results[name]["median_ms"]:>10.2f} ms',
+              file=sys.stderr)
+    return {
+        'version': BASELINE_VERSION,
+        'meta': {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'git': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': {k: getattr(args, k) for k in
+                      ('students', 'courses', 'courses_per_cell', 'weeks', 'sections', 'weekdays', 'span', 'dpi')},
+            'size': workload.size,
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """打印与基线的比值(按 min_ms)，返回变慢超过 threshold 倍的用例名。"""
+    if baseline.get('meta', {}).get('scale') != report['meta']['scale']:
+        print('注意：基线的规模参数与本次不同，比值仅供参考', file=sys.stderr)
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base or 'min_ms' not in base or 'min_ms' not in result:
+            continue
+        ratio = result['min_ms'] / base['min_ms'] if base['min_ms'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            flag = '  <-- 变慢'
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = '  (变快)'
+        print(f'{name:<22} {base["min_ms"]:>10.2f} -> {result["min_ms"]:>10.2f} ms  x{ratio:.2f}{flag}')
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='课表流水线基准测试(合成课表)')
+    ap.add_argument('--students', type=int, default=4, help='合成课表份数')
+    ap.add_argument('--courses', type=int, default=12, help='每份课表的课程数')
+    ap.add_argument('--courses-per-cell', type=int, default=1, help='每个单元格的课程数')
+    ap.add_argument('--weeks', type=int, default=16)
+    ap.add_argument('--sections', type=int, default=14, help='每天的节次数')
+    ap.add_argument('--weekdays', type=int, default=5, help='有课的天数(1-7)')
+    ap.add_argument('--span', type=int, default=2, help='每门课连续的节数')
+    ap.add_argument('--dpi', type=int, default=100, help='图片用例的 DPI')
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--cases', help='逗号分隔的用例名，默认除 render_matplotlib 外全部')
+    ap.add_argument('--json', metavar='PATH', help='把结果写成 JSON')
+    ap.add_argument('--save', metavar='NAME', help=f'保存为基线 {BASELINE_DIR.name}/NAME.json')
+    ap.add_argument('--compare', metavar='PATH', help='与基线 JSON 对比')
+    ap.add_argument('--threshold', type=float, default=1.5, help='判定变慢的倍数')
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, ensure_ascii=False, indent=2) + '\n'
+    if args.json:
+        Path(args.json).write_text(text, encoding='utf-8')
+    if args.save:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        (BASELINE_DIR / f'{args.save}.json').write_text(text, encoding='utf-8')
+        print(f'已保存基线: {BASELINE_DIR / (args.save + ".json")}', file=sys.stderr)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f'比基线慢 {args.threshold} 倍以上: {", ".join(regressions)}', file=sys.stderr)
+            return 1
+    elif not args.json and not args.save:
+        print(text, end='')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
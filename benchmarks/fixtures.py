@@ -0,0 +1,108 @@
+"""合成的 xskb_print.do 风格课表 xls，供模拟服务器与基准测试使用(需要 xlwt)。
+
+布局与教务系统导出的一致：第 3 行起每行一节课，第 0 列是 '第N节\\nHH:MM-HH:MM'，第 1-7 列是周一到周日；
+连续几节的课程在每一行重复同样的单元格文本，一个单元格里可以有多门课。
+"""
+import io
+import random
+import zlib
+
+try:
+    import xlwt
+except ImportError:  # pragma: no cover
+    xlwt = None
+
+HEADER_ROWS = 3
+WEEKDAY_LABELS = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+SECTION_TIMES = [
+    '08:00-08:45', '08:50-09:35', '09:50-10:35', '10:40-11:25', '11:30-12:15',
+    '13:00-13:45', '13:50-14:35', '14:45-15:30', '15:40-16:25', '16:35-17:20',
+    '17:25-18:10', '18:30-19:15', '19:20-20:05', '20:10-20:55',
+]
+COURSE_NAMES = [
+    '数据挖掘', '神经网络与深度学习', '羽毛球', '编译原理', '操作系统', '计算机网络', '数据库系统原理',
+    '软件工程', '概率论与随机过程', '形式语言与自动机', '计算机组成原理', '信息论', '机器学习', '英语听说',
+]
+TEACHERS = ['张三', '李四', '王五', '赵六', '孙七', '周八', '吴九', '郑十']
+PLACES = ['教3-101', '教3-205', '教4-202', '教1-111', '体育馆', '图书馆-301', '主楼-620']
+
+
+def section_time(idx):
+    if idx < len(SECTION_TIMES):
+        return SECTION_TIMES[idx]
+    # 超出标准作息的节次按每节 45 分钟、间隔 5 分钟往后排
+    start = 21 * 60 + (idx - len(SECTION_TIMES)) * 50
+    end = start + 45
+    return f'{start // 60 % 24:02d}:{start % 60:02d}-{end // 60 % 24:02d}:{end % 60:02d}'
+
+
+def week_patterns(weeks):
+    half = max(1, weeks // 2)
+    return [
+        f'1-{weeks}[周]',
+        f'1-{half}[周]',
+        f'{min(weeks, half + 1)}-{weeks}[周]',
+        f'1-{weeks - (1 - weeks % 2)}(单)[周]',
+        f'2-{weeks - weeks % 2}(双)[周]',
+        f'1-{max(1, half - 2)},{half}-{weeks}[周]',
+    ]
+
+
+def course_block(rng, name, weeks, first_section, span):
+    labels = '-'.join(f'{first_section + i + 1:02d}' for i in range(span))
+    lines = [name]
+    if rng.random() < 0.2:
+        lines.append(f'({rng.randint(1, 9)})')
+    lines += [rng.choice(TEACHERS), rng.choice(week_patterns(weeks)), rng.choice(PLACES), f'[{labels}节]']
+    return '\n'.join(lines)
+
+
+def make_grid(seed=0, courses=12, weeks=16, sections=14, weekdays=5, courses_per_cell=1, span=2):
+    """返回 {(行, 列): 单元格文本}，行从 0 开始对应第 1 节，列从 1 开始对应周一。"""
+    rng = random.Random(seed)
+    slots = [(day, start) for day in range(1, weekdays + 1) for start in range(0, sections - span + 1, span)]
+    rng.shuffle(slots)
+    courses_per_cell = max(1, courses_per_cell)
+
+    blocks = {}
+    for i in range(courses):
+        slot_idx = i // courses_per_cell
+        if slot_idx >= len(slots):
+            break
+        day, start = slots[slot_idx]
+        name = COURSE_NAMES[i % len(COURSE_NAMES)] + ('' if i < len(COURSE_NAMES) else str(i // len(COURSE_NAMES)))
+        blocks.setdefault((day, start), []).append(course_block(rng, name, weeks, start, span))
+
+    grid = {}
+    for (day, start), texts in blocks.items():
+        text = '\n'.join(texts)
+        for row in range(start, start + span):
+            grid[(row, day)] = text
+    return grid
+
+
+def make_xls_bytes(seed=0, courses=12, weeks=16, sections=14, weekdays=5, courses_per_cell=1, span=2):
+    if xlwt is None:
+        raise RuntimeError('生成合成课表需要 xlwt: pip install xlwt')
+    grid = make_grid(seed, courses, weeks, sections, weekdays, courses_per_cell, span)
+
+    wb = xlwt.Workbook(encoding='utf-8')
+    ws = wb.add_sheet('课表')
+    ws.write(0, 0, '北京邮电大学 学生个人课表')
+    ws.write(1, 0, f'合成数据 seed={seed}')
+    ws.write(2, 0, '节次')
+    for col, label in enumerate(WEEKDAY_LABELS, start=1):
+        ws.write(2, col, label)
+    for row in range(sections):
+        ws.write(HEADER_ROWS + row, 0, f'第{row + 1}节\n{section_time(row)}')
+        for col in range(1, len(WEEKDAY_LABELS) + 1):
+            ws.write(HEADER_ROWS + row, col, grid.get((row, col), ' '))
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def account_seed(account):
+    """同一个学号总是得到同一份课表。"""
+    return zlib.crc32(str(account).encode('utf-8'))
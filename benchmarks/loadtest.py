@@ -0,0 +1,175 @@
+"""对本地模拟教务系统做端到端压测，输出吞吐量与 p50/p95/p99 延迟。
+
+    # 直接调用 syllabus 流水线(登录 -> 抓取 -> 解析 -> 导出)
+    python -m benchmarks.loadtest pipeline -n 200 -c 16 --latency 0.05
+
+    # 压测 Django /login/：自动启动模拟服务器与 runserver 子进程
+    python -m benchmarks.loadtest django -n 200 -c 16 --spawn-django 8001
+
+    # 或压测已经在运行的后端(启动时需设置 SYLLABUS_JWGL_BASE 指向 --mock-port 上的模拟服务器)
+    python -m benchmarks.loadtest django --url http://127.0.0.1:8000/login/ --mock-port 8765
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from . import mock_jwgl
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def summarize(name, latencies, errors, wall):
+    ok = sorted(latencies)
+    total = len(latencies) + len(errors)
+    return {
+        'scenario': name,
+        'requests': total,
+        'ok': len(ok),
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(total / wall, 2) if wall else 0.0,
+        'mean_ms': round(sum(ok) / len(ok) * 1000, 1) if ok else 0.0,
+        'p50_ms': round(percentile(ok, 50) * 1000, 1),
+        'p95_ms': round(percentile(ok, 95) * 1000, 1),
+        'p99_ms': round(percentile(ok, 99) * 1000, 1),
+    }
+
+
+def drive(task, n, concurrency):
+    """用 concurrency 个线程执行 task(i) 共 n 次，返回 (成功的耗时列表, 错误列表, 总耗时)。"""
+    latencies, errors = [], []
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            task(i)
+        except Exception as e:
+            return None, f'{type(e).__name__}: {e}'
+        return time.perf_counter() - start, None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, error in pool.map(one, range(n)):
+            if error is None:
+                latencies.append(latency)
+            else:
+                errors.append(error)
+    return latencies, errors, time.perf_counter() - start
+
+
+def account_for(i, args):
+    return f'2025{(i % args.accounts if args.accounts else i):06d}'
+
+
+def run_pipeline(args, base_url):
+    import syllabus
+    from syllabus import client, upstream
+
+    client.set_base_url(base_url)
+    options = syllabus.load_options()
+    if args.upstream_rate:
+        options.upstream_rate = args.upstream_rate
+        options.upstream_concurrency = max(options.upstream_concurrency, args.concurrency * 3)
+    upstream.configure_from_options(options, workers=args.concurrency)
+    out_root = Path(tempfile.mkdtemp(prefix='syllabus-loadtest-'))
+
+    def task(i):
+        account = account_for(i, args)
+        syllabus.run(options, account, 'pw', output_dir=out_root / f'{i:06d}', force=True)
+
+    return drive(task, args.requests, args.concurrency)
+
+
+def spawn_django(port, base_url):
+    env = dict(os.environ, SYLLABUS_JWGL_BASE=base_url, PYTHONUNBUFFERED='1')
+    proc = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}'],
+        cwd=REPO_DIR / 'BASBACK', env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f'http://127.0.0.1:{port}/login/'
+    for _ in range(100):
+        try:
+            requests.get(url, timeout=1)
+            return proc, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit('runserver 启动失败')
+
+
+def run_django(args, base_url):
+    proc = None
+    url = args.url
+    if args.spawn_django:
+        proc, url = spawn_django(args.spawn_django, base_url)
+    http = requests.Session()
+    http.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency))
+
+    def task(i):
+        r = http.get(url, params={'id': account_for(i, args), 'pw': 'pw'}, timeout=60)
+        if r.status_code != 200 or not r.text.startswith('data:text/calendar,'):
+            raise RuntimeError(f'HTTP {r.status_code}')
+
+    try:
+        return drive(task, args.requests, args.concurrency)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='基于本地模拟教务系统的端到端压测')
+    ap.add_argument('scenario', choices=['pipeline', 'django'])
+    ap.add_argument('-n', '--requests', type=int, default=100)
+    ap.add_argument('-c', '--concurrency', type=int, default=8)
+    ap.add_argument('--accounts', type=int, default=0, help='循环使用的账号数(0 表示每个请求一个新账号，避免命中缓存)')
+    ap.add_argument('--mock-port', type=int, default=0, help='模拟服务器端口(0 为随机)')
+    ap.add_argument('--upstream-rate', type=float, default=1000.0,
+                    help='pipeline 场景下放宽 syllabus.upstream 的限速(0 表示保持默认配置)')
+    ap.add_argument('--url', default='http://127.0.0.1:8000/login/', help='django 场景的 /login/ 地址')
+    ap.add_argument('--spawn-django', type=int, default=0, metavar='PORT', help='在该端口启动 runserver 子进程')
+    ap.add_argument('--json', metavar='PATH', help='把结果写成 JSON')
+    mock_jwgl.add_mock_arguments(ap)
+    args = ap.parse_args(argv)
+
+    server, base_url = mock_jwgl.start_server(port=args.mock_port, **mock_jwgl.mock_options(args))
+    print(f'模拟教务系统: {base_url}')
+    try:
+        if args.scenario == 'pipeline':
+            latencies, errors, wall = run_pipeline(args, base_url)
+        else:
+            latencies, errors, wall = run_django(args, base_url)
+    finally:
+        server.shutdown()
+
+    report = summarize(args.scenario, latencies, errors, wall)
+    report['mock'] = dict(server.state.counters)
+    report['params'] = {k: v for k, v in vars(args).items() if k not in ('json',)}
+    for key in ('requests', 'ok', 'errors', 'wall_seconds', 'throughput_rps', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'):
+        print(f'{key:>15}: {report[key]}')
+    for sample in report['error_samples']:
+        print(f'{"error":>15}: {sample}')
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
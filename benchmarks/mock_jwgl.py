@@ -0,0 +1,188 @@
+"""本地模拟的教务系统，只实现抓课表用到的三个接口：
+
+    GET  /jsxsd/                   下发 JSESSIONID
+    POST /jsxsd/xk/LoginToXk       校验 encoded 中的账号密码，标记会话已登录
+    POST /jsxsd/xskb/xskb_print.do 已登录时返回按学号生成的合成 xls，否则返回登录页 html
+
+用法：python -m benchmarks.mock_jwgl --port 8765 --latency 0.05 --error-rate 0.01
+然后让客户端指向它：SYLLABUS_JWGL_BASE=http://127.0.0.1:8765/jsxsd/
+"""
+import argparse
+import base64
+import functools
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import fixtures
+
+LOGIN_PAGE = '<html><head><title>登录</title></head><body>请先登录</body></html>'.encode('utf-8')
+
+
+class MockState:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, ready_delay=0.0, reject_prefix='bad', seed=0,
+                 xls_options=None):
+        self.latency = latency
+        self.ready_delay = ready_delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.reject_prefix = reject_prefix
+        self.rng = random.Random(seed)
+        self.xls_options = xls_options or {}
+        self.sessions = {}  # JSESSIONID -> (已登录的学号, 登录时间)；学号为 None 表示未登录
+        self.lock = threading.Lock()
+        self.counters = {'requests': 0, 'errors': 0, 'logins': 0, 'timetables': 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def delay(self):
+        with self.lock:
+            d = max(0.0, self.rng.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            fail = self.rng.random() < self.error_rate
+        if d:
+            time.sleep(d)
+        return fail
+
+    @functools.lru_cache(maxsize=1024)
+    def timetable(self, account):
+        return fixtures.make_xls_bytes(seed=fixtures.account_seed(account), **self.xls_options)
+
+
+def decode_credentials(encoded):
+    """encoded 是 encodeInp(学号) + '%%%' + encodeInp(密码)，encodeInp 即标准 base64。"""
+    account, _, password = encoded.partition('%%%')
+    try:
+        return base64.b64decode(account).decode('utf-8'), base64.b64decode(password).decode('utf-8')
+    except ValueError:
+        return '', ''
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, body, content_type='text/html;charset=utf-8', status=200, cookie=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if cookie:
+                self.send_header('Set-Cookie', f'JSESSIONID={cookie}; Path=/jsxsd')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def session_id(self):
+            for part in self.headers.get('Cookie', '').split(';'):
+                name, _, value = part.strip().partition('=')
+                if name == 'JSESSIONID':
+                    return value
+            return None
+
+        def read_form(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return dict(urllib.parse.parse_qsl(self.rfile.read(length).decode('utf-8')))
+
+        def begin(self):
+            state.count('requests')
+            if state.delay():
+                state.count('errors')
+                self.send_body(b'Internal Server Error', 'text/plain', status=500)
+                return False
+            return True
+
+        def do_GET(self):
+            if not self.begin():
+                return
+            if urllib.parse.urlsplit(self.path).path.rstrip('/') != '/jsxsd':
+                return self.send_body(b'Not Found', 'text/plain', status=404)
+            sid = secrets.token_hex(16)
+            with state.lock:
+                state.sessions[sid] = (None, 0.0)
+            self.send_body(LOGIN_PAGE, cookie=sid)
+
+        def do_POST(self):
+            form = self.read_form()
+            if not self.begin():
+                return
+            path = urllib.parse.urlsplit(self.path).path
+            sid = self.session_id()
+            if path == '/jsxsd/xk/LoginToXk':
+                account, password = decode_credentials(form.get('encoded', ''))
+                ok = bool(account) and account == form.get('userAccount') and not password.startswith(state.reject_prefix)
+                if ok and sid is not None:
+                    with state.lock:
+                        state.sessions[sid] = (account, time.monotonic())
+                    state.count('logins')
+                return self.send_body('<html><body>{}</body></html>'.format('ok' if ok else '密码错误').encode('utf-8'))
+            if path == '/jsxsd/xskb/xskb_print.do':
+                with state.lock:
+                    account, logged_in_at = state.sessions.get(sid, (None, 0.0))
+                # 登录后 ready_delay 秒内会话尚未就绪，和真实系统一样返回登录页
+                if account is None or time.monotonic() - logged_in_at < state.ready_delay:
+                    return self.send_body(LOGIN_PAGE)
+                state.count('timetables')
+                return self.send_body(state.timetable(account), 'application/vnd.ms-excel')
+            self.send_body(b'Not Found', 'text/plain', status=404)
+
+    return Handler
+
+
+def start_server(host='127.0.0.1', port=0, **state_options):
+    """在后台线程启动模拟服务器，返回 (server, base_url)；server.state 可读取计数器。"""
+    state = MockState(**state_options)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, name='mock-jwgl', daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}/jsxsd/'
+
+
+def add_mock_arguments(ap):
+    ap.add_argument('--latency', type=float, default=0.02, help='每个请求的平均延迟(秒)')
+    ap.add_argument('--jitter', type=float, default=0.0, help='延迟的标准差(秒)')
+    ap.add_argument('--error-rate', type=float, default=0.0, help='返回 500 的概率')
+    ap.add_argument('--ready-delay', type=float, default=0.0, help='登录后会话多久才能抓到课表(秒)')
+    ap.add_argument('--courses', type=int, default=12, help='每个学生的课程数')
+    ap.add_argument('--courses-per-cell', type=int, default=1)
+    ap.add_argument('--weeks', type=int, default=16)
+    ap.add_argument('--sections', type=int, default=14)
+
+
+def mock_options(args):
+    return {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'ready_delay': args.ready_delay,
+        'xls_options': {
+            'courses': args.courses,
+            'courses_per_cell': args.courses_per_cell,
+            'weeks': args.weeks,
+            'sections': args.sections,
+        },
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='本地模拟教务系统')
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    add_mock_arguments(ap)
+    args = ap.parse_args(argv)
+    server, base_url = start_server(args.host, args.port, **mock_options(args))
+    print(f'模拟教务系统已启动: {base_url}  (Ctrl+C 退出)')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
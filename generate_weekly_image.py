@@ -1,307 +1,327 @@
-from pathlib import Path
-import re
+import argparse
 import datetime
-import xlrd
-import matplotlib.pyplot as plt
-import chinese_calendar as cc
+from pathlib import Path
 
-try:
-    import config
-except Exception:
-    config = None
+from syllabus import (
+    TimetableFormatError, build_events, load_options, load_timetable, normalize_section, open_sheet, parse_lessons,
+    section_sort_key, split_section_slots,
+)
+from syllabus import chart, raster, vector
 
 
-OUTPUT_DIR = Path(getattr(config, 'output_dir', 'output') if config else 'output')
+OPTIONS = load_options()
+OUTPUT_DIR = OPTIONS.output_dir
+TIMETABLE_PATH = OUTPUT_DIR / 'timetable.jsonl'
 XLS_PATH = OUTPUT_DIR / 'fetched_kb.xls'
 OUT_PATH = OUTPUT_DIR / 'semester_16week_vertical.png'
+SVG_PATH = OUT_PATH.with_suffix('.svg')
+HTML_PATH = OUT_PATH.with_suffix('.html')
+TILE_CACHE_DIR = OUTPUT_DIR / '.tiles'
+WEEK_TILE_DIR = OUTPUT_DIR / 'weeks'
+IMAGE_FORMATS = ('png', 'svg', 'html')
 
-COURSE_COLORS = [
-    '#E8F1FF', '#EAF7EE', '#FFF4E5', '#F3ECFF', '#FFECEF',
-    '#EAF4F4', '#FFF9E6', '#EAF0FF', '#F1F8EA', '#FDEEF4',
-]
+COURSE_COLORS = chart.COURSE_COLORS
 
 CHINESE_COURSES = {'数据挖掘', '神经网络与深度学习', '羽毛球'}
 
 
-def parse_cell_courses(cell_info: str):
-    lines = [line.strip() for line in str(cell_info).splitlines() if str(line).strip()]
-    courses = []
-    for idx, line in enumerate(lines):
-        if '[周]' not in line or not re.search(r'\d', line):
-            continue
-        if idx + 2 >= len(lines):
-            continue
-        place = lines[idx + 1]
-        section = lines[idx + 2]
-        if '节' not in section:
-            continue
-        name_idx = idx - 2
-        if name_idx >= 0 and re.fullmatch(r'\(\d+\)', lines[name_idx]):
-            name_idx -= 1
-        if name_idx < 0:
-            continue
-        name = lines[name_idx]
-        courses.append({'name': name, 'week': line, 'place': place, 'section': section})
-    return courses
-
-
-def expand_week_numbers(week_text: str):
-    raw = str(week_text).replace('，', ',').replace(' ', '')
-    odd_only = '单' in raw
-    even_only = '双' in raw
-    raw = raw.replace('周', '')
-    raw = re.sub(r'\[.*?\]', '', raw)
-    raw = re.sub(r'\(.*?\)', '', raw)
-
-    nums = []
-    for item in raw.split(','):
-        if not item:
+def to_image_events(lesson_events):
+    """把 syllabus 展开的逐周事件转换成图片使用的 (周次, 星期, 节次, 文本) 事件。"""
+    events = []
+    for e in lesson_events:
+        w = e['week_num']
+        if w < 1:
             continue
-        if '-' in item:
-            left, right = item.split('-', 1)
-            if left.isdigit() and right.isdigit():
-                nums.extend(range(int(left), int(right) + 1))
-        elif item.isdigit():
-            nums.append(int(item))
-
-    nums = sorted(set(nums))
-    if odd_only:
-        nums = [n for n in nums if n % 2 == 1]
-    elif even_only:
-        nums = [n for n in nums if n % 2 == 0]
-    return nums
-
-
-def section_sort_key(section_label: str):
-    nums = [int(x) for x in re.findall(r'\d+', section_label)]
-    return nums if nums else [999]
-
-
-def normalize_section(section_text: str):
-    s = str(section_text).replace('节', '').strip()
-    s = s.strip('[]')
-    return s
-
-
-def split_section_slots(section_label: str):
-    nums = [int(x) for x in re.findall(r'\d+', str(section_label))]
-    if not nums:
-        return [str(section_label)]
-    if len(nums) <= 2:
-        if len(nums) == 1:
-            return [f'{nums[0]:02d}']
-        return [f'{nums[0]:02d}-{nums[1]:02d}']
-
-    slots = []
-    i = 0
-    while i < len(nums):
-        if i + 1 < len(nums):
-            slots.append(f'{nums[i]:02d}-{nums[i+1]:02d}')
-            i += 2
-        else:
-            slots.append(f'{nums[i]:02d}')
-            i += 1
-    return slots
+        section_slots = split_section_slots(normalize_section(e['section']))
+        lang_tag = '[中]' if e['name'] in CHINESE_COURSES else '[英]'
+        for slot in section_slots:
+            events.append({
+                'week': w,
+                'weekday': e['weekday'],
+                'section': slot,
+                'text': f"{e['name']}{lang_tag} {e['place']}",
+            })
+    return events
 
 
 def parse_all_events_from_xls(path: Path):
-    wb = xlrd.open_workbook(str(path))
-    ws = wb.sheet_by_index(0)
+    lessons = parse_lessons(open_sheet(path), combine=True)
+    return to_image_events(build_events(lessons, OPTIONS.term_start_date, OPTIONS.skip_holidays))
 
-    events = []
-    for col in range(1, 6):
-        for row in range(3, 17):
-            cell_info = ws.cell_value(rowx=row, colx=col)
-            if not isinstance(cell_info, str) or not cell_info.strip() or cell_info.strip() == ' ':
-                continue
-            if row > 3 and cell_info == ws.cell_value(rowx=row - 1, colx=col):
-                continue
-
-            end_row = row
-            while end_row + 1 < 17 and ws.cell_value(rowx=end_row + 1, colx=col) == cell_info:
-                end_row += 1
-
-            for c in parse_cell_courses(cell_info):
-                section_label = normalize_section(c['section'])
-                section_slots = split_section_slots(section_label)
-                lang_tag = '[中]' if c['name'] in CHINESE_COURSES else '[英]'
-                for w in expand_week_numbers(c['week']):
-                    if 1 <= w <= 16:
-                        for slot in section_slots:
-                            events.append({
-                                'week': w,
-                                'weekday': col,
-                                'section': slot,
-                                'text': f"{c['name']}{lang_tag} {c['place']}",
-                            })
-    return events
+
+def header_term_start(header):
+    """timetable.jsonl 记录的学期第1周周一；事件日期按它展开，表头与节假日底色也要用它而不是当前 config.py。"""
+    return datetime.date.fromisoformat(header.get('term_start_date') or OPTIONS.term_start_date.isoformat())
+
+
+def load_all_events():
+    """优先读取 process.py 写出的 timetable.jsonl；不存在或不兼容时才回退到解析 fetched_kb.xls。
+
+    返回 (事件, 学期第1周周一, 学期)，后两者取自 timetable.jsonl 的文件头，回退解析时取自 config.py。
+    """
+    try:
+        header, _lessons, lesson_events = load_timetable(TIMETABLE_PATH)
+        return to_image_events(lesson_events), header_term_start(header), header.get('xueqi') or OPTIONS.xueqi
+    except TimetableFormatError:
+        pass
+
+    xls_path = XLS_PATH
+    if not xls_path.exists() and Path('fetched_kb.xls').exists():
+        xls_path = Path('fetched_kb.xls')
+    if not xls_path.exists():
+        raise SystemExit(f'找不到 {TIMETABLE_PATH} 或 {XLS_PATH}，请先运行 process.py 生成课表文件')
+    print(f'未找到可用的 {TIMETABLE_PATH}，改为重新解析 {xls_path}')
+    return parse_all_events_from_xls(xls_path), OPTIONS.term_start_date, OPTIONS.xueqi
 
 
 def build_grid(events):
-    weekdays = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
+    weekdays = chart.WEEKDAY_NAMES
     sections = sorted({e['section'] for e in events}, key=section_sort_key)
 
-    per_week = {}
-    for week in range(1, 17):
-        grid = {(sec, day): [] for sec in sections for day in range(1, 8)}
-        for e in events:
-            if e['week'] == week:
-                grid[(e['section'], e['weekday'])].append(e['text'])
-        per_week[week] = grid
+    # 一次遍历建立 周次 -> (节次, 星期) -> 文本 的稀疏索引，空格子不占内存(读取时用 chart.cell_texts)
+    # 至少画 16 周，有更晚的课时延长到最后一周
+    per_week = {week: {} for week in range(1, max([16] + [e['week'] for e in events]) + 1)}
+    for e in events:
+        per_week[e['week']].setdefault((e['section'], e['weekday']), []).append(e['text'])
     return weekdays, sections, per_week
 
 
-def get_term_start_date():
-    default_date = datetime.date(2026, 3, 2)
-    if config is None:
-        return default_date
-    raw = getattr(config, 'term_start_date', '2026-03-02')
-    try:
-        return datetime.datetime.strptime(str(raw), '%Y-%m-%d').date()
-    except ValueError:
-        return default_date
+MPL_FONTS = ['Arial Unicode MS', 'PingFang SC', 'Heiti SC', 'STHeiti', 'SimHei', 'Noto Sans CJK SC']
+WEEK_FIG_HEIGHT = 34 / 16
+WEEK_GAP = 0.05  # 单周图上下留白占比，拼接后近似整图 tight_layout(h_pad=0.8) 的周间距
 
 
-def draw_vertical_weeks(weekdays, sections, per_week, out_path: Path):
-    plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'PingFang SC', 'Heiti SC', 'STHeiti', 'SimHei', 'Noto Sans CJK SC']
+def setup_matplotlib():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.rcParams['font.sans-serif'] = MPL_FONTS
     plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+
+def draw_week_table(ax, week_idx, sections, grid, headers, course_color_map):
+    ax.axis('off')
 
-    fig_h = max(34, 2.15 * 16)
-    fig, axes = plt.subplots(16, 1, figsize=(14.0, fig_h))
+    cell_text = []
+    for sec in sections:
+        row = []
+        for day in range(1, 8):
+            row.append(chart.CELL_SEPARATOR.join(chart.cell_texts(grid, sec, day)))
+        cell_text.append(row)
+
+    weekday_labels = [label for label, _ in headers]
+    day_types = [day_type for _, day_type in headers]
+
+    table = ax.table(
+        cellText=cell_text,
+        rowLabels=sections,
+        colLabels=weekday_labels,
+        loc='center',
+        cellLoc='left',
+        colWidths=[0.105] * 7,
+        bbox=[0.10, 0.02, 0.89, 0.96],
+    )
+
+    ax.text(
+        0.055,
+        0.5,
+        f'第{week_idx}周',
+        transform=ax.transAxes,
+        rotation=90,
+        va='center',
+        ha='center',
+        fontsize=11,
+        color=chart.TEXT_COLOR,
+        weight='bold',
+        clip_on=True,
+    )
+    table.auto_set_font_size(False)
+    table.set_fontsize(7.2)
+    table.scale(1, 1.4)
+
+    for (r, c), cell in table.get_celld().items():
+        cell.set_edgecolor(chart.EDGE_COLOR)
+        cell.set_linewidth(0.6)
+        if r == 0:
+            if c >= 0 and c < len(day_types):
+                cell.set_facecolor(chart.HEADER_FILLS[day_types[c]])
+            else:
+                cell.set_facecolor(chart.HEADER_FILLS['normal'])
+            cell.set_text_props(weight='bold', color=chart.TEXT_COLOR, ha='center')
+        elif c == -1:
+            cell.set_facecolor(chart.ROW_LABEL_FILL)
+            cell.set_text_props(weight='bold', color=chart.ROW_LABEL_COLOR, ha='center')
+        else:
+            texts = chart.cell_texts(grid, sections[r - 1], c + 1)
+            cell.set_facecolor(chart.cell_fill(texts, course_color_map))
+            cell.set_text_props(color=chart.TEXT_COLOR, ha='left')
+
+
+def draw_vertical_weeks(weekdays, sections, per_week, out_path: Path, dpi=600, term_start=None):
+    plt = setup_matplotlib()
+    term_start = term_start or OPTIONS.term_start_date
+
+    weeks = sorted(per_week)
+    fig_h = max(34, 2.15 * len(weeks))
+    fig, axes = plt.subplots(len(weeks), 1, figsize=(14.0, fig_h))
     fig.patch.set_facecolor('#FFFFFF')
     if hasattr(axes, 'ravel'):
         axes = axes.ravel().tolist()
     elif not isinstance(axes, list):
         axes = [axes]
 
-    term_start = get_term_start_date()
-
-    def extract_course_name(text: str):
-        t = str(text).strip()
-        if not t:
-            return ''
-        if ' ' in t:
-            return t.rsplit(' ', 1)[0].strip()
-        return t
-
-    all_course_names = sorted({
-        extract_course_name(e)
-        for week in per_week.values()
-        for cell in week.values()
-        for e in cell
-        if extract_course_name(e)
-    })
-    course_color_map = {
-        name: COURSE_COLORS[idx % len(COURSE_COLORS)]
-        for idx, name in enumerate(all_course_names)
-    }
-
-    for week_idx in range(1, 17):
-        ax = axes[week_idx - 1]
-        ax.axis('off')
-
-        cell_text = []
-        for sec in sections:
-            row = []
-            for day in range(1, 8):
-                texts = sorted(set(per_week[week_idx][(sec, day)]))
-                row.append(' ｜ '.join(texts))
-            cell_text.append(row)
-
-        weekday_labels = []
-        day_types = []
-        for day in range(1, 8):
-            d = term_start + datetime.timedelta(days=(week_idx - 1) * 7 + (day - 1))
-            is_weekend = d.weekday() >= 5
-            is_holiday, holiday_name = cc.get_holiday_detail(d)
-            holiday_label = str(holiday_name) if holiday_name else ''
-
-            label_parts = [f'{weekdays[day - 1]} {d.strftime("%m/%d")}']
-            day_type = 'normal'
-            if is_holiday and d.year == 2026:
-                label_parts.append(f'法定节假日({holiday_label})' if holiday_label else '法定节假日')
-                day_type = 'holiday'
-            elif is_weekend:
-                label_parts.append('周末')
-                day_type = 'weekend'
-
-            weekday_labels.append('\n'.join(label_parts))
-            day_types.append(day_type)
-
-        table = ax.table(
-            cellText=cell_text,
-            rowLabels=sections,
-            colLabels=weekday_labels,
-            loc='center',
-            cellLoc='left',
-            colWidths=[0.105] * 7,
-            bbox=[0.10, 0.02, 0.89, 0.96],
-        )
-
-        ax.text(
-            0.055,
-            0.5,
-            f'第{week_idx}周',
-            transform=ax.transAxes,
-            rotation=90,
-            va='center',
-            ha='center',
-            fontsize=11,
-            color='#111827',
-            weight='bold',
-            clip_on=True,
-        )
-        table.auto_set_font_size(False)
-        table.set_fontsize(7.2)
-        table.scale(1, 1.4)
-
-        for (r, c), cell in table.get_celld().items():
-            cell.set_edgecolor('#E5E7EB')
-            cell.set_linewidth(0.6)
-            if r == 0:
-                if c >= 0 and c < len(day_types):
-                    if day_types[c] == 'holiday':
-                        cell.set_facecolor('#FEE2E2')
-                    elif day_types[c] == 'weekend':
-                        cell.set_facecolor('#E0F2FE')
-                    else:
-                        cell.set_facecolor('#F3F4F6')
-                else:
-                    cell.set_facecolor('#F3F4F6')
-                cell.set_text_props(weight='bold', color='#111827', ha='center')
-            elif c == -1:
-                cell.set_facecolor('#F9FAFB')
-                cell.set_text_props(weight='bold', color='#374151', ha='center')
-            else:
-                sec = sections[r - 1]
-                day = c + 1
-                texts = sorted(set(per_week[week_idx][(sec, day)]))
-                names = {extract_course_name(t) for t in texts if extract_course_name(t)}
-                if len(names) == 1:
-                    only_name = next(iter(names))
-                    cell.set_facecolor(course_color_map.get(only_name, '#FFFFFF'))
-                else:
-                    cell.set_facecolor('#FFFFFF')
-                cell.set_text_props(color='#111827', ha='left')
+    course_color_map = chart.course_color_map(per_week)
+
+    for ax, week_idx in zip(axes, weeks):
+        headers = chart.day_headers(term_start, week_idx)
+        draw_week_table(ax, week_idx, sections, per_week[week_idx], headers, course_color_map)
 
     plt.tight_layout(h_pad=0.8, rect=(0.0, 0.01, 1, 1))
-    fig.savefig(out_path, dpi=600, bbox_inches='tight', pad_inches=0.03)
+    fig.savefig(out_path, dpi=dpi, bbox_inches='tight', pad_inches=0.03)
     plt.close(fig)
 
 
-def main():
-    xls_path = XLS_PATH
-    if not xls_path.exists() and Path('fetched_kb.xls').exists():
-        xls_path = Path('fetched_kb.xls')
-    if not xls_path.exists():
-        raise SystemExit(f'找不到 {XLS_PATH}，请先运行 process.py 生成课表文件')
-
+def render_week_figure(job):
+    """在子进程中把一周画成单独的图，返回 ((宽, 高), RGBA 像素)；各周尺寸相同，便于直接拼接。"""
+    dpi, week_idx, sections, grid, headers, course_color_map = job
+    plt = setup_matplotlib()
+    fig = plt.figure(figsize=(14.0, WEEK_FIG_HEIGHT), dpi=dpi)
+    fig.patch.set_facecolor('#FFFFFF')
+    ax = fig.add_axes((0.0, WEEK_GAP / 2, 1.0, 1 - WEEK_GAP))
+    draw_week_table(ax, week_idx, sections, grid, headers, course_color_map)
+    fig.canvas.draw()
+    size = fig.canvas.get_width_height()
+    raw = bytes(fig.canvas.buffer_rgba())
+    plt.close(fig)
+    return size, raw
+
+
+def draw_vertical_weeks_tiled(sections, per_week, out_path: Path, dpi=600, workers=1, cache_dir=None,
+                              tiled=False, week_dir=None, term_start=None):
+    """每周单独渲染(workers > 1 时在进程池里并行)，再按周次顺序拼成 semester_16week_vertical.png。
+
+    给出 cache_dir 时按内容哈希复用上次渲染的周面板，返回实际重新渲染的周数。
+    tiled 为 True 时逐周写入 PNG 而不拼出整张大图；week_dir 不为空时另存每周的 week_XX.png。
+    """
+    term_start = term_start or OPTIONS.term_start_date
+    course_color_map = chart.course_color_map(per_week)
+    weeks = sorted(per_week)
+    jobs = [
+        (dpi, week_idx, list(sections), per_week[week_idx], chart.day_headers(term_start, week_idx), course_color_map)
+        for week_idx in weeks
+    ]
+    keys = [raster.tile_key('matplotlib', dpi, week_idx, sections, raster.grid_items(grid), headers,
+                            chart.grid_colors(grid, color_map))
+            for dpi, week_idx, sections, grid, headers, color_map in jobs]
+    cache = raster.TileCache(cache_dir) if cache_dir else None
+    if tiled:
+        tiles = raster.iter_tiles(render_week_figure, jobs, keys, workers, cache, mode='RGBA')
+        return raster.write_tiles_png(tiles, out_path, len(jobs), dpi, weeks, week_dir)
+
+    tiles, rendered = raster.render_tiles(render_week_figure, jobs, keys, workers, cache, mode='RGBA')
+    raster.stitch(tiles, mode='RGBA').convert('RGB').save(out_path, format='PNG', dpi=(dpi, dpi))
+    if week_dir is not None:
+        for week, tile in zip(weeks, tiles):
+            raster.save_week_tile(tile.convert('RGB'), week_dir, week, dpi)
+    return rendered
+
+
+def draw_image(sections, per_week, out_path: Path, backend=None, dpi=None, workers=None, tiled=None, week_tiles=None,
+               term_start=None):
+    """按 image_backend 选择渲染后端：matplotlib(默认，与旧版一致)或 pillow(快得多，适合批量/在线生成)。
+
+    逐周渲染的方式(pillow，或 workers > 1 / tiled 的 matplotlib)会在 image_cache 开启时复用没有变化的周面板，
+    返回实际重新渲染的周数；matplotlib 整图渲染返回 None。
+    tiled 为 True 时逐周编码写盘，峰值内存与 DPI 无关地只有一周面板大小；week_tiles 另存每周的图片。
+    term_start 为表头日期所用的学期第1周周一，默认取 config.py。
+    """
+    term_start = term_start or OPTIONS.term_start_date
+    backend = backend or OPTIONS.image_backend
+    dpi = dpi or OPTIONS.image_dpi
+    workers = workers or OPTIONS.image_workers
+    tiled = OPTIONS.image_tiled if tiled is None else tiled
+    week_dir = WEEK_TILE_DIR if (OPTIONS.image_week_tiles if week_tiles is None else week_tiles) else None
+    cache_dir = TILE_CACHE_DIR if OPTIONS.image_cache else None
+    if backend == 'pillow':
+        return raster.save_weeks_png(sections, per_week, term_start, out_path, dpi=dpi or raster.DEFAULT_DPI,
+                                     font_path=OPTIONS.image_font, workers=workers, cache_dir=cache_dir and cache_dir / 'pillow',
+                                     tiled=tiled, week_dir=week_dir)
+    if backend == 'matplotlib' and (workers > 1 or tiled or week_dir is not None):
+        return draw_vertical_weeks_tiled(sections, per_week, out_path, dpi=dpi or 600, workers=workers,
+                                         cache_dir=cache_dir and cache_dir / 'matplotlib', tiled=tiled, week_dir=week_dir,
+                                         term_start=term_start)
+    if backend == 'matplotlib':
+        draw_vertical_weeks(chart.WEEKDAY_NAMES, sections, per_week, out_path, dpi=dpi or 600, term_start=term_start)
+        return None
+    raise SystemExit(f'未知的 image_backend: {backend}，可选 matplotlib / pillow')
+
+
+def render_batch(output_dirs, dpi=None, tiled=None):
+    """给多个 output 目录(如 python -m syllabus.batch 的每个账号目录)各生成一张图片，返回成功的目录数。
+
+    用 pillow 后端；同一学期的表头、网格线等骨架只画一次(raster.TermTemplate)，每个学生只叠加课程。
+    同一学期的图片统一使用所有学生节次的并集作为行，尺寸一致。
+    """
+    dpi = dpi or OPTIONS.image_dpi or raster.DEFAULT_DPI
+    tiled = OPTIONS.image_tiled if tiled is None else tiled
+    students = {}
+    for output_dir in map(Path, output_dirs):
+        try:
+            header, _lessons, lesson_events = load_timetable(output_dir / 'timetable.jsonl')
+        except TimetableFormatError as e:
+            print(f'跳过 {output_dir}: {e}')
+            continue
+        term_start = header_term_start(header)
+        _weekdays, sections, per_week = build_grid(to_image_events(lesson_events))
+        students.setdefault(term_start, []).append((output_dir, sections, per_week))
+
+    done = 0
+    for term_start, items in students.items():
+        all_sections = sorted({sec for _, sections, _ in items for sec in sections}, key=section_sort_key)
+        template = raster.TermTemplate(term_start, dpi, OPTIONS.image_font, sections=all_sections)
+        for output_dir, sections, per_week in items:
+            template.save_png(sections, per_week, output_dir / OUT_PATH.name, tiled=tiled)
+            done += 1
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成学期竖版周课表图片(至少 16 周)')
+    parser.add_argument('--backend', choices=['matplotlib', 'pillow'], help='渲染后端，默认取 config.py 的 image_backend')
+    parser.add_argument('--dpi', type=int, help='输出 DPI，默认取 config.py 的 image_dpi')
+    parser.add_argument('-j', '--workers', type=int, help='并行渲染的进程数，默认取 config.py 的 image_workers')
+    parser.add_argument('--tiled', action='store_true', default=None, help='逐周编码写盘，限制高 DPI 下的内存占用')
+    parser.add_argument('--week-tiles', action='store_true', default=None, help=f'另把每周存成单独的图片 ({WEEK_TILE_DIR}/week_XX.png)')
+    parser.add_argument('--batch', nargs='+', metavar='DIR', help='批量模式：为每个目录中的 timetable.jsonl 生成图片(pillow 后端)')
+    parser.add_argument('--formats', help='输出格式，逗号分隔的 png/svg/html，默认取 config.py 的 image_formats')
+    args = parser.parse_args(argv)
+    formats = [f.strip().lower() for f in (args.formats or OPTIONS.image_formats).split(',') if f.strip()]
+    unknown = set(formats) - set(IMAGE_FORMATS)
+    if unknown:
+        raise SystemExit(f'未知的输出格式: {", ".join(sorted(unknown))}，可选 png / svg / html')
+
+    if args.batch:
+        done = render_batch(args.batch, dpi=args.dpi, tiled=args.tiled)
+        print(f'已为 {done}/{len(args.batch)} 个目录生成 {OUT_PATH.name}')
+        return
+
+    events, term_start, xueqi = load_all_events()
     OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    events = parse_all_events_from_xls(xls_path)
     weekdays, sections, per_week = build_grid(events)
-    draw_vertical_weeks(weekdays, sections, per_week, OUT_PATH)
-    print(f'已生成图片: {OUT_PATH}')
+    if 'png' in formats:
+        rendered = draw_image(sections, per_week, OUT_PATH, backend=args.backend, dpi=args.dpi, workers=args.workers,
+                              tiled=args.tiled, week_tiles=args.week_tiles, term_start=term_start)
+        print(f'已生成图片: {OUT_PATH}')
+        if rendered is not None:
+            print(f'重新渲染 {rendered}/{len(per_week)} 周，其余沿用 {TILE_CACHE_DIR} 中的缓存')
+    if 'svg' in formats:
+        vector.write_svg(SVG_PATH, sections, per_week, term_start)
+        print(f'已生成矢量图: {SVG_PATH}')
+    if 'html' in formats:
+        vector.write_html(HTML_PATH, sections, per_week, term_start, title=f'{xueqi} 课表')
+        print(f'已生成网页: {HTML_PATH}')
     print(f'事件总数: {len(events)}; 节次行数: {len(sections)}')
 
 
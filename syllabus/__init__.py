@@ -0,0 +1,25 @@
+"""BUPT 课表抓取与日历生成的核心流程。
+
+导入本包没有任何副作用(不清屏、不等待、不联网)，CLI、图片生成脚本与 Django 后端都调用这里的函数。
+"""
+from .changes import EventDiff, diff_events, load_state, save_state
+from .chart import course_color_map, day_headers
+from .client import LoginError, encodeInp, fetch_timetable, login, new_session
+from .events import build_events, calc_lesson_date, event_uid, group_recurring, iter_events, week_mapping_preview
+from .export import (
+    direct_link, iter_calendar_blocks, iter_direct_link, iter_ics, write_16week_chart, write_calendar_files,
+    write_direct, write_ics,
+)
+from .options import Options, load_options
+from .parser import (
+    PARSER_VERSION, SheetFormatError, SheetLayout, clear_caches, detect_layout, expand_week_numbers, has_course_cells,
+    iter_cell_blocks, load_sheet, normalize_section, open_sheet, parse_cell_courses, parse_lessons, section_sort_key,
+    split_section_slots,
+)
+from .pipeline import OutputPaths, RunResult, run
+from .raster import render_weeks, save_weeks_png
+from .sessions import SessionStore
+from .term import TermCalendar, TermDay, term_calendar
+from .timetable import TimetableFormatError, load_timetable, write_timetable
+from .upstream import UpstreamUnavailable
+from .vector import iter_html, iter_svg, write_html, write_svg
@@ -0,0 +1,106 @@
+"""多账号批量生成：python -m syllabus.batch accounts.csv -j 8
+
+账号文件每行一个 `学号,密码`，空行和 # 开头的行会被忽略。
+每个账号使用独立的 session，产物写到 output_dir/<学号>/，单个账号失败不影响其他账号。
+"""
+import argparse
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import upstream
+from .options import load_options
+from .pipeline import run
+
+
+@dataclass
+class BatchItem:
+    account: str
+    ok: bool
+    seconds: float
+    output_dir: Path
+    events: int = 0
+    skipped: bool = False  # 课表未变化，沿用已有产物
+    error: str = ''
+
+
+def read_accounts(path):
+    accounts = []
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].strip().startswith('#'):
+                continue
+            if len(row) < 2:
+                raise ValueError(f'账号文件格式错误(应为 学号,密码): {row[0]}')
+            accounts.append((row[0].strip(), row[1].strip()))
+    return accounts
+
+
+def _run_one(options, account, password, output_dir):
+    start = time.perf_counter()
+    try:
+        result = run(options, account, password, output_dir=output_dir)
+    except Exception as e:
+        return BatchItem(account, False, time.perf_counter() - start, output_dir, error=f'{type(e).__name__}: {e}')
+    return BatchItem(account, True, time.perf_counter() - start, output_dir, events=len(result.events),
+                     skipped=result.skipped)
+
+
+def run_batch(accounts, options=None, workers=4, on_done=None):
+    """用有界线程池并发处理多个账号，按完成顺序回调 on_done，返回与 accounts 同序的 BatchItem 列表。"""
+    if options is None:
+        options = load_options()
+    workers = max(1, min(int(workers), len(accounts) or 1))
+
+    items = [None] * len(accounts)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='syllabus') as pool:
+        futures = {
+            pool.submit(_run_one, options, account, password, Path(options.output_dir) / account): idx
+            for idx, (account, password) in enumerate(accounts)
+        }
+        for future in as_completed(futures):
+            item = future.result()
+            items[futures[future]] = item
+            if on_done is not None:
+                on_done(item)
+    return items
+
+
+def main(argv=None):
+    options = load_options()
+    ap = argparse.ArgumentParser(description='批量为多个账号生成课表日历')
+    ap.add_argument('accounts', help='账号文件，每行 学号,密码')
+    ap.add_argument('-j', '--workers', type=int, default=options.batch_workers,
+                    help='并发账号数(默认读取 config.py 的 batch_workers)')
+    ap.add_argument('-o', '--output-dir', default=None, help='输出根目录，每个账号一个子目录')
+    ap.add_argument('--upstream-rate', type=float, default=options.upstream_rate,
+                    help='访问教务系统的限速，每秒请求数(默认读取 config.py 的 upstream_rate)；每个账号约 3 个请求')
+    args = ap.parse_args(argv)
+    if args.output_dir:
+        options = load_options(output_dir=Path(args.output_dir))
+    if options.term_start_note:
+        print(options.term_start_note)
+    options.upstream_rate = args.upstream_rate
+    upstream.configure_from_options(options, workers=args.workers)
+
+    accounts = read_accounts(args.accounts)
+    start = time.perf_counter()
+
+    def report(item):
+        if item.skipped:
+            print(f'[SKIP] {item.account}: 课表未变化, {item.seconds:.1f}s')
+        elif item.ok:
+            print(f'[OK]   {item.account}: {item.events} 个事件, {item.seconds:.1f}s -> {item.output_dir}')
+        else:
+            print(f'[FAIL] {item.account}: {item.error}')
+
+    items = run_batch(accounts, options, workers=args.workers, on_done=report)
+    failed = [i for i in items if not i.ok]
+    print(f'完成 {len(items) - len(failed)}/{len(items)} 个账号, 用时 {time.perf_counter() - start:.1f}s')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+STATE_VERSION = 1
+# 参与比较的字段；只要其中任意一项变化就视为课程被修改(SEQUENCE +1)
+FINGERPRINT_FIELDS = ('name', 'place', 'date', 'time_start', 'time_end', 'interval', 'count', 'exdates')
+
+
+def event_fingerprint(e):
+    payload = json.dumps([e.get(name) for name in FINGERPRINT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class EventDiff:
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    cancelled: list = field(default_factory=list)
+    unchanged: int = 0
+    state: dict = field(default_factory=dict)
+
+    @property
+    def updates(self):
+        """增量日历需要携带的事件：新增、修改与取消。"""
+        return self.added + self.changed + self.cancelled
+
+
+def load_state(path):
+    """读取上一次生成的事件集合；文件不存在或版本不符时返回空集合。"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != STATE_VERSION:
+        return {}
+    return data.get('events', {})
+
+
+def save_state(path, state):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': STATE_VERSION, 'events': state}, f, ensure_ascii=False)
+
+
+def diff_events(events, previous):
+    """与上次的事件集合比较，给每个事件填好 sequence，并分出新增/修改/取消三类。
+
+    previous 为 load_state 的返回值；返回的 EventDiff.state 供 save_state 保存。
+    """
+    diff = EventDiff()
+    for e in events:
+        fingerprint = event_fingerprint(e)
+        old = previous.get(e['uid'])
+        if old is None:
+            e['sequence'] = 0
+            diff.added.append(e)
+        elif old['fingerprint'] != fingerprint:
+            e['sequence'] = old['sequence'] + 1
+            diff.changed.append(e)
+        else:
+            e['sequence'] = old['sequence']
+            diff.unchanged += 1
+        diff.state[e['uid']] = {'fingerprint': fingerprint, 'sequence': e['sequence'], 'event': e}
+
+    for uid, old in previous.items():
+        if uid in diff.state:
+            continue
+        e = dict(old['event'], sequence=old['sequence'] + 1, status='CANCELLED')
+        diff.cancelled.append(e)
+    return diff
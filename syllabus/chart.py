@@ -0,0 +1,72 @@
+"""学期周课表图片的公共数据：配色、表头(日期/节假日/周末)与单元格内容，各个渲染后端共用。
+
+per_week 的结构为 {周次: {(节次, 星期): [文本, ...]}}，由 generate_weekly_image.build_grid 生成。
+"""
+from .export import WEEKDAY_NAMES
+from .term import term_calendar
+
+COURSE_COLORS = [
+    '#E8F1FF', '#EAF7EE', '#FFF4E5', '#F3ECFF', '#FFECEF',
+    '#EAF4F4', '#FFF9E6', '#EAF0FF', '#F1F8EA', '#FDEEF4',
+]
+HEADER_FILLS = {'holiday': '#FEE2E2', 'weekend': '#E0F2FE', 'normal': '#F3F4F6'}
+ROW_LABEL_FILL = '#F9FAFB'
+EMPTY_FILL = '#FFFFFF'
+EDGE_COLOR = '#E5E7EB'
+TEXT_COLOR = '#111827'
+ROW_LABEL_COLOR = '#374151'
+CELL_SEPARATOR = ' ｜ '
+
+
+def course_name(text):
+    """'课程名[英] 教室' -> '课程名[英]'，用于按课程着色。"""
+    t = str(text).strip()
+    if ' ' in t:
+        return t.rsplit(' ', 1)[0].strip()
+    return t
+
+
+def course_color_map(per_week):
+    names = sorted({
+        course_name(text)
+        for grid in per_week.values()
+        for cell in grid.values()
+        for text in cell
+        if course_name(text)
+    })
+    return {name: COURSE_COLORS[idx % len(COURSE_COLORS)] for idx, name in enumerate(names)}
+
+
+def grid_colors(grid, color_map):
+    """一周里出现的课程用到的颜色；周面板的缓存键只依赖它，别的周增删课程不会让这一周重画。"""
+    return {name: color_map[name] for name in {course_name(t) for texts in grid.values() for t in texts} if name in color_map}
+
+
+def cell_texts(grid, section, weekday):
+    return sorted(set(grid.get((section, weekday), ())))
+
+
+def cell_fill(texts, color_map):
+    """格子里只有一门课时用该课程的颜色，空格子或多门课冲突时为白色。"""
+    names = {course_name(t) for t in texts if course_name(t)}
+    if len(names) == 1:
+        return color_map.get(next(iter(names)), EMPTY_FILL)
+    return EMPTY_FILL
+
+
+def day_headers(term_start, week):
+    """某一周 7 天的 (表头文字, 类型)，类型为 holiday/weekend/normal，对应 HEADER_FILLS。"""
+    headers = []
+    for name, day in zip(WEEKDAY_NAMES, term_calendar(term_start).week(week)):
+        label_parts = [f'{name} {day.label}']
+        day_type = 'normal'
+        if day.is_holiday:
+            label_parts.append(f'法定节假日({day.holiday_name})')
+            day_type = 'holiday'
+        elif day.is_makeup_workday:
+            label_parts.append('调休上班')
+        elif day.is_weekend:
+            label_parts.append('周末')
+            day_type = 'weekend'
+        headers.append(('\n'.join(label_parts), day_type))
+    return headers
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import upstream
+
+# 教务系统入口；可用环境变量 SYLLABUS_JWGL_BASE 或 set_base_url() 指向本地模拟服务器(benchmarks/mock_jwgl.py)
+BASE_URL = os.environ.get('SYLLABUS_JWGL_BASE', 'https://jwgl.bupt.edu.cn/jsxsd/')
+KBJCMSID = '9475847A3F3033D1E05377B5030AA94D'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.82 Safari/537.36'
+
+# 进程内共享的上游连接池大小(同时保持的 keep-alive 连接数)
+POOL_SIZE = 32
+
+# 别动
+keyStr = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=' # DO NOT CHANGE!!!
+
+
+class LoginError(Exception):
+    """教务系统返回了登录页而不是课表(一般是学号或密码错误)。"""
+
+
+# LoginToXk 登录失败时重新返回登录页，页面上带有这些提示；成功时跳转到教务主页
+LOGIN_FAILURE_MARKERS = ('密码错误', '帐号不存在', '账号不存在', '用户名或密码')
+
+
+def set_base_url(url):
+    global BASE_URL
+    BASE_URL = url if url.endswith('/') else url + '/'
+
+
+def login_url():
+    return BASE_URL + 'xk/LoginToXk'
+
+
+def timetable_url():
+    return BASE_URL + 'xskb/xskb_print.do'
+
+
+class SharedAdapter(HTTPAdapter):
+    """进程内所有 session 共用的连接池；单个 session 关闭时不关闭它。"""
+
+    def close(self):
+        pass
+
+
+_shared_adapter = None
+_shared_adapter_lock = threading.Lock()
+
+
+def shared_adapter():
+    global _shared_adapter
+    with _shared_adapter_lock:
+        if _shared_adapter is None:
+            _shared_adapter = SharedAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+        return _shared_adapter
+
+
+def new_session():
+    """每个账号一个 session(cookie 互不影响)，底层 TCP/TLS 连接在进程内复用，省去重复握手。"""
+    session = requests.session()
+    adapter = shared_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def encodeInp(input):
+    output = ''
+    i = 0
+    while True:
+        chr1 = ord(input[i])
+        i += 1
+        chr2 = ord(input[i]) if i < len(input) else 0
+        i += 1
+        chr3 = ord(input[i]) if i < len(input) else 0
+        i += 1
+        enc1 = chr1 >> 2
+        enc2 = ((chr1 & 3) << 4) | (chr2 >> 4)
+        enc3 = ((chr2 & 15) << 2) | (chr3 >> 6)
+        enc4 = chr3 & 63
+        if chr2 == 0:
+            enc3 = enc4 = 64
+        elif chr3 == 0:
+            enc4 = 64
+        output = output + keyStr[enc1] + keyStr[enc2] + keyStr[enc3] + keyStr[enc4]
+        if i >= len(input):
+            break
+    return output
+
+
+def login(account: str, password: str, session=None):
+    """登录新教务，返回带登录态的 requests session；学号或密码错误时立即抛出 LoginError。"""
+    if session is None:
+        session = new_session()
+
+    l1 = upstream.request(session, 'GET', BASE_URL)
+    cookie = ''
+    for name, value in l1.cookies.items():
+        cookie += '{0}={1}; '.format(name, value)
+
+    # 第二次请求，发送cookie和密码
+    headers = {
+        'Host': urllib.parse.urlsplit(BASE_URL).netloc,
+        'Referer': login_url() + '?method=exit&tktime=1631723647000',
+        'User-Agent': USER_AGENT,
+        'cookie': cookie,
+    }
+    encoded = encodeInp(account) + '%%%' + encodeInp(password)
+    payload = {'userAccount': account, 'userPassWord': '', 'encoded': encoded}
+    resp = upstream.request(session, 'POST', login_url(), data=payload, headers=headers)
+    if login_failed(resp.text):
+        raise LoginError('学号或密码错误')
+    return session
+
+
+def login_failed(text: str):
+    return any(marker in text for marker in LOGIN_FAILURE_MARKERS)
+
+
+# xls(OLE2 复合文档)与 xlsx(zip)的文件头
+WORKBOOK_MAGICS = (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', b'PK\x03\x04')
+# 登录后会话可能还没就绪，拿到登录页时按 0.25s、0.5s、1s、2s 退避重试
+READY_RETRIES = 4
+READY_BACKOFF = 0.25
+
+
+def is_workbook(content: bytes):
+    return content.startswith(WORKBOOK_MAGICS)
+
+
+def fetch_timetable(session, xueqi: str, retries: int = READY_RETRIES, backoff: float = READY_BACKOFF) -> bytes:
+    """第三次请求带上cookie，下载课表 xls 的原始字节。
+
+    立即请求；返回的不是工作簿(一般是登录页 html，会话尚未就绪)时指数退避重试。login 已经识别了密码错误，
+    这里的重试只等待已登录的会话就绪；重试用尽(或 retries=0 时复用的旧会话已失效)抛出 LoginError。
+    """
+    data = {'xnxq01id': xueqi, 'zc': '', 'kbjcmsid': KBJCMSID}
+    url = '{}?xnxq01id={}&zc=&kbjcmsid={}'.format(timetable_url(), xueqi, KBJCMSID)
+    for attempt in range(retries + 1):
+        p = upstream.request(session, 'POST', url, data=data)
+        if is_workbook(p.content):
+            return p.content
+        if attempt < retries:
+            time.sleep(backoff * (2 ** attempt))
+    raise LoginError('教务系统返回了登录页，会话未能就绪')
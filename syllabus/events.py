@@ -0,0 +1,96 @@
+import datetime
+import hashlib
+
+from .parser import expand_week_numbers
+from .term import term_calendar
+
+
+def calc_lesson_date(term_start, week_num, weekday_num):
+    return term_calendar(term_start).day(week_num, weekday_num).ymd
+
+
+def week_mapping_preview(term_start):
+    weekday_names = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
+    week = term_calendar(term_start).week(1)
+    return [(name, day.ymd) for name, day in zip(weekday_names, week)]
+
+
+def event_uid(name, weekday, time_start, time_end, week_num=None, place=None):
+    """由课程名、星期、时间段(和周次或地点)得到稳定的 UID，重复导入时日历会更新而不是新增一份。"""
+    key = '|'.join(str(part) for part in (name, weekday, time_start, time_end, week_num, place) if part is not None)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20] + '@bupt-auto-syllabu'
+
+
+def iter_events(lessons, term_start, skip_holidays=False):
+    """把课程片段按周次展开成具体的上课事件，ICS 与 16 周图表共用。
+
+    skip_holidays 为 True 时跳过落在法定节假日的课(调休上班的周末不受影响，教务课表里本来也没有这些课)。
+    """
+    calendar = term_calendar(term_start)
+    for l in lessons:
+        time_all, weekday = l['time'].split('+')
+        time_start = ''.join(time_all.split('-')[0].split(':')) + '00'
+        time_end = ''.join(time_all.split('-')[1].split(':')) + '00'
+        weekday = int(weekday)
+        for week_num in expand_week_numbers(l['week']):
+            day = calendar.day(week_num, weekday)
+            if skip_holidays and day.is_holiday:
+                continue
+            yield {
+                'uid': event_uid(l['name'], weekday, time_start, time_end, week_num),
+                'name': l['name'],
+                'place': l['place'],
+                'section': l['section'],
+                'date': day.ymd,
+                'time_start': time_start,
+                'time_end': time_end,
+                'week_num': week_num,
+                'weekday': weekday,
+                'time_range': time_all,
+            }
+
+
+def build_events(lessons, term_start, skip_holidays=False):
+    return list(iter_events(lessons, term_start, skip_holidays))
+
+
+def weekly_interval(weeks):
+    """单/双周课程(所有周次奇偶相同)按隔周重复，其余按每周重复。"""
+    if len(weeks) > 1 and all((w - weeks[0]) % 2 == 0 for w in weeks):
+        return 2
+    return 1
+
+
+def group_recurring(events):
+    """把同一门课在同一时间段的逐周事件合并成一组，用于生成 RRULE/EXDATE。
+
+    返回的每组带有 weeks(升序周次)、dates(与 weeks 对应的日期)、interval 与 exweeks(重复范围内缺的周次)。
+    """
+    groups = {}
+    for e in events:
+        key = (e['name'], e['place'], e['weekday'], e['time_start'], e['time_end'])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = dict(e, dates={})
+        group['dates'][e['week_num']] = e['date']
+
+    result = []
+    for group in groups.values():
+        dates = group.pop('dates')
+        weeks = sorted(dates)
+        interval = weekly_interval(weeks)
+        first = datetime.datetime.strptime(dates[weeks[0]], '%Y%m%d').date()
+        exweeks = [w for w in range(weeks[0], weeks[-1] + 1, interval) if w not in dates]
+        group.update({
+            # 地点也是分组键的一部分：期中换教室的课分成两组，各自需要不同的 UID
+            'uid': event_uid(group['name'], group['weekday'], group['time_start'], group['time_end'],
+                             place=group['place']),
+            'week_num': weeks[0],
+            'date': dates[weeks[0]],
+            'weeks': weeks,
+            'interval': interval,
+            'count': (weeks[-1] - weeks[0]) // interval + 1,
+            'exdates': [(first + datetime.timedelta(weeks=w - weeks[0])).strftime('%Y%m%d') for w in exweeks],
+        })
+        result.append(group)
+    return result
@@ -0,0 +1,142 @@
+import csv
+import datetime
+import urllib.parse
+
+from .events import group_recurring
+
+WEEKDAY_NAMES = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
+
+
+ICS_FOOTER = 'END:VCALENDAR'
+DIRECT_PREFIX = 'data:text/calendar,'
+
+
+def format_dtstamp(moment=None):
+    moment = moment or datetime.datetime.now(datetime.timezone.utc)
+    return moment.strftime('%Y%m%dT%H%M%SZ')
+
+
+def recurrence_lines(group):
+    """压缩模式下一组重复课程的 RRULE/EXDATE 行；逐周事件与只上一次的课不需要。"""
+    if group.get('count', 1) <= 1:
+        return ()
+    lines = ['RRULE:FREQ=WEEKLY;INTERVAL={};COUNT={}'.format(group['interval'], group['count'])]
+    if group['exdates']:
+        lines.append('EXDATE;TZID=Asia/Shanghai:' + ','.join(
+            '{}T{}'.format(d, group['time_start']) for d in group['exdates']))
+    return tuple(lines)
+
+
+def event_lines(e, dtstamp):
+    """一个 VEVENT 的全部行；sequence/status 由 changes.diff_events 填写(取消的课程带 STATUS:CANCELLED)。"""
+    extra = ()
+    if e.get('sequence'):
+        extra += ('SEQUENCE:{}'.format(e['sequence']),)
+    if e.get('status'):
+        extra += ('STATUS:' + e['status'],)
+    return (
+        'BEGIN:VEVENT',
+        'DTSTAMP:' + dtstamp,
+        'UID:' + e['uid'],
+        'SUMMARY:{} {}'.format(e['name'], e['place']),
+        'DTSTART;TZID=Asia/Shanghai:{}T{}'.format(e['date'], e['time_start']),
+        'DTEND;TZID=Asia/Shanghai:{}T{}'.format(e['date'], e['time_end']),
+    ) + recurrence_lines(e) + extra + (
+        'BEGIN:VALARM',
+        'X-WR-ALARMUID:F03864BD-41F4-40EC-BF20-1E4E7930ED92',
+        'UID:' + e['uid'] + '-alarm',
+        'TRIGGER:-PT5M',
+        'ATTACH;VALUE=URI:Chord',
+        'ACTION:AUDIO',
+        'END:VALARM',
+        'END:VEVENT',
+    )
+
+
+def iter_calendar_blocks(events, compact=False):
+    """逐块产出 ICS 行：日历头、每个 VEVENT、日历尾。events 可以是生成器，整个过程只遍历一次。
+
+    compact 为 True 时把每门课的逐周事件合并成带 RRULE/EXDATE 的重复事件(需要先读完全部事件再分组)。
+    """
+    dtstamp = format_dtstamp()
+    yield ('BEGIN:VCALENDAR', 'VERSION:2.0')
+    if compact:
+        events = group_recurring(events)
+    for e in events:
+        yield event_lines(e, dtstamp)
+    yield (ICS_FOOTER,)
+
+
+def _join_block(block, newline):
+    text = newline.join(block)
+    # 与旧版输出保持一致：最后的 END:VCALENDAR 后面不换行
+    return text if block[-1] == ICS_FOOTER else text + newline
+
+
+def iter_ics(events, newline='\r\n', compact=False):
+    for block in iter_calendar_blocks(events, compact):
+        yield _join_block(block, newline)
+
+
+def quote_ics(text):
+    return urllib.parse.quote(text, safe='~@#$&()*!+=:;,.?/\'')
+
+
+def iter_direct_link(events, compact=False):
+    """流式生成 data URI 形式的日历导入链接(direct.txt 与后端接口共用)。"""
+    yield DIRECT_PREFIX
+    for chunk in iter_ics(events, compact=compact):
+        yield quote_ics(chunk)
+
+
+def direct_link(events, compact=False):
+    return ''.join(iter_direct_link(events, compact))
+
+
+def write_ics(path, events, compact=False):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(iter_ics(events, newline='\n', compact=compact))
+
+
+def write_direct(path, events, compact=False):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(iter_direct_link(events, compact))
+
+
+def write_calendar_files(ics_path, direct_path, events, compact=False):
+    """一次遍历同时写 calendar.ics 与 direct.txt，两者的 UID 也因此保持一致。"""
+    with open(ics_path, 'w', encoding='utf-8') as fics, open(direct_path, 'w', encoding='utf-8') as fdirect:
+        fdirect.write(DIRECT_PREFIX)
+        for block in iter_calendar_blocks(events, compact):
+            fics.write(_join_block(block, '\n'))
+            fdirect.write(quote_ics(_join_block(block, '\r\n')))
+
+
+def write_16week_chart(rows, markdown_path='semester_16week_chart.md', csv_path='semester_16week_chart.csv'):
+    """按周次×星期汇总的课表图表，至少 16 周，有更晚的课时延长到最后一周(文件名沿用 16week)。"""
+    chart = {}
+    for row in rows:
+        week = row['week_num']
+        day = row['weekday']
+        if week >= 1 and 1 <= day <= 7:
+            chart.setdefault((week, day), []).append(f"{row['name']}@{row['place']} {row['time_range']}")
+    weeks = range(1, max([16] + [week for week, _day in chart]) + 1)
+
+    with open(csv_path, 'w', encoding='utf-8-sig', newline='') as fcsv:
+        writer = csv.writer(fcsv)
+        writer.writerow(['周次'] + WEEKDAY_NAMES)
+        for week in weeks:
+            line = [str(week)]
+            for day in range(1, 8):
+                line.append(' | '.join(sorted(set(chart.get((week, day), ())))))
+            writer.writerow(line)
+
+    with open(markdown_path, 'w', encoding='utf-8') as fmd:
+        fmd.write(f'# {len(weeks)}周课表图表\n\n')
+        fmd.write('| 周次 | ' + ' | '.join(WEEKDAY_NAMES) + ' |\n')
+        fmd.write('| ' + ' | '.join(['---'] * (len(WEEKDAY_NAMES) + 1)) + ' |\n')
+        for week in weeks:
+            cells = []
+            for day in range(1, 8):
+                cells.append('<br>'.join(sorted(set(chart.get((week, day), ())))))
+            fmd.write(f"| {week} | " + ' | '.join(cells) + ' |\n')
@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+from .parser import PARSER_VERSION
+
+MANIFEST_VERSION = 1
+
+
+def sha256_bytes(content: bytes):
+    return hashlib.sha256(content).hexdigest()
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def config_fingerprint(options):
+    """影响解析与导出结果的配置项。"""
+    return {
+        'xueqi': options.xueqi,
+        'term_start_date': options.term_start_date.isoformat(),
+        'Combine_Trigger': options.combine,
+        'compact_ics': options.compact_ics,
+        'skip_holidays': options.skip_holidays,
+        'parser_version': PARSER_VERSION,
+    }
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != MANIFEST_VERSION:
+        return None
+    return data
+
+
+def build_manifest(xls_hash, options, output_paths):
+    return {
+        'version': MANIFEST_VERSION,
+        'xls_sha256': xls_hash,
+        'config': config_fingerprint(options),
+        'outputs': {p.name: sha256_file(p) for p in output_paths},
+    }
+
+
+def save_manifest(path, manifest):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def is_up_to_date(manifest, xls_hash, options, output_dir):
+    """课表字节、相关配置与上次一致，且上次的产物都还在且未被改动时返回 True。"""
+    if manifest is None:
+        return False
+    if manifest.get('xls_sha256') != xls_hash or manifest.get('config') != config_fingerprint(options):
+        return False
+    for name, digest in manifest.get('outputs', {}).items():
+        path = output_dir / name
+        if not path.exists() or sha256_file(path) != digest:
+            return False
+    return True
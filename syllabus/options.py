@@ -0,0 +1,112 @@
+import datetime
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_XUEQI = '2025-2026-2'
+DEFAULT_TERM_START = '2026-03-02'
+
+
+def load_user_config():
+    try:
+        import config as user_config
+    except Exception:
+        user_config = None
+    return user_config
+
+
+def resolve_term_start_date(raw, year='2026', begin_week=9):
+    """返回 (日期, 回退说明)；term_start_date 有效时说明为 None。不直接打印，由 CLI 决定是否提示。"""
+    try:
+        return datetime.datetime.strptime(str(raw), '%Y-%m-%d').date(), None
+    except ValueError:
+        pass
+
+    try:
+        old_rule_week = begin_week - 1
+        d = datetime.datetime.strptime(f'{year}-W{old_rule_week}-1', '%Y-W%W-%w').date()
+        return d, f'term_start_date 格式无效，已按旧规则回退为: {d}'
+    except Exception:
+        today = datetime.date.today()
+        monday = today - datetime.timedelta(days=today.weekday())
+        return monday, f'term_start_date/旧规则都不可用，已回退到系统日期所在周一: {monday}'
+
+
+@dataclass
+class Options:
+    xueqi: str = DEFAULT_XUEQI  # 学期数
+    term_start_date: datetime.date = datetime.date(2026, 3, 2)  # 学期第1周周一
+    term_start_note: str = None  # term_start_date 无效、使用了回退日期时的说明
+    combine: bool = True  # 连着几节的课程是否合并(Combine_Trigger)
+    compact_ics: bool = False  # 用 RRULE/EXDATE 合并每周重复的课程，ICS 体积小一个数量级
+    skip_holidays: bool = False  # 不为法定节假日当天的课生成日历事件(需要 chinese_calendar)
+    output_dir: Path = Path('output')
+    show_week_mapping: bool = True
+    year: str = '2026'  # 年份(兼容旧字段)
+    begin_week: int = 9  # 开学的当周(兼容旧字段)
+    year_week: int = 53  # 今年总周数(兼容旧字段)
+    account: str = ''
+    password: str = ''
+    batch_workers: int = 4  # 批量模式的并发账号数
+    upstream_rate: float = 5.0  # 访问教务系统的限速(每秒请求数，见 syllabus.upstream)
+    upstream_burst: int = 10  # 令牌桶容量，允许的突发请求数
+    upstream_concurrency: int = 16  # 同时进行的教务系统请求上限
+    reuse_session: bool = False  # 保存登录 cookie，下次运行先用旧会话抓课表(见 syllabus.sessions)
+    session_dir: Path = None  # 默认 output_dir/.sessions
+    session_ttl: float = 1800  # 旧会话最长复用多久(秒)
+    image_backend: str = 'matplotlib'  # generate_weekly_image 的渲染后端：matplotlib / pillow
+    image_dpi: int = None  # 图片 DPI，默认 matplotlib 600、pillow 200
+    image_font: str = None  # pillow 后端使用的中文字体文件，默认自动查找
+    image_workers: int = 1  # 按周并行渲染图片的进程数，1 为在当前进程逐周渲染
+    image_cache: bool = True  # 逐周渲染时缓存周面板(output_dir/.tiles)，只重画有变化的周
+    image_formats: str = 'png'  # generate_weekly_image 的输出格式，逗号分隔的 png/svg/html
+    image_tiled: bool = False  # 逐周编码写出 PNG，高 DPI 下内存占用只有一周面板大小
+    image_week_tiles: bool = False  # 另把每周存成 output_dir/weeks/week_XX.png
+
+
+def load_options(user_config=None, **overrides):
+    """从 config.py 读取配置，未提供的字段使用默认值；overrides 优先级最高。"""
+    if user_config is None:
+        user_config = load_user_config()
+
+    def cfg(name, default):
+        if user_config is None:
+            return default
+        return getattr(user_config, name, default)
+
+    year = str(cfg('year', '2026'))
+    begin_week = int(cfg('begin_week', 9))
+    term_start_date, term_start_note = resolve_term_start_date(cfg('term_start_date', DEFAULT_TERM_START), year, begin_week)
+    options = Options(
+        xueqi=str(cfg('xueqi', DEFAULT_XUEQI)),
+        term_start_date=term_start_date,
+        term_start_note=term_start_note,
+        combine=bool(cfg('Combine_Trigger', True)),
+        compact_ics=bool(cfg('compact_ics', False)),
+        skip_holidays=bool(cfg('skip_holidays', False)),
+        output_dir=Path(str(cfg('output_dir', 'output'))),
+        show_week_mapping=bool(cfg('show_week_mapping', True)),
+        year=year,
+        begin_week=begin_week,
+        year_week=int(cfg('year_week', 53)),
+        account=str(cfg('account', '')).strip(),
+        password=str(cfg('password', '')).strip(),
+        batch_workers=int(cfg('batch_workers', 4)),
+        upstream_rate=float(cfg('upstream_rate', 5.0)),
+        upstream_burst=int(cfg('upstream_burst', 10)),
+        upstream_concurrency=int(cfg('upstream_concurrency', 16)),
+        reuse_session=bool(cfg('reuse_session', False)),
+        session_dir=cfg('session_dir', None),
+        session_ttl=float(cfg('session_ttl', 1800)),
+        image_backend=str(cfg('image_backend', 'matplotlib')),
+        image_dpi=int(cfg('image_dpi', 0) or 0) or None,
+        image_font=cfg('image_font', None),
+        image_workers=int(cfg('image_workers', 1)),
+        image_cache=bool(cfg('image_cache', True)),
+        image_formats=str(cfg('image_formats', 'png')),
+        image_tiled=bool(cfg('image_tiled', False)),
+        image_week_tiles=bool(cfg('image_week_tiles', False)),
+    )
+    for name, value in overrides.items():
+        setattr(options, name, value)
+    options.session_dir = Path(options.session_dir) if options.session_dir else options.output_dir / '.sessions'
+    return options
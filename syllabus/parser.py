@@ -0,0 +1,240 @@
+import functools
+import re
+from typing import NamedTuple
+
+import xlrd
+
+# 解析结果的格式版本；解析逻辑的输出有变化时加一，后端缓存随之失效
+PARSER_VERSION = 3
+
+HEADER_SCAN_ROWS = 10  # 在前几行里找 星期一..星期日 表头
+
+# 预编译的正则；下面的函数在每个单元格、每个学生上都会被反复调用
+BRACKET_RE = re.compile(r'\[.*?\]|\(.*?\)')
+DIGIT_RE = re.compile(r'\d')
+NUMBER_RE = re.compile(r'\d+')
+COURSE_INDEX_RE = re.compile(r'\(\d+\)')
+# 表头单元格必须整格就是星期名，'姓名:周天宇'、'周一至周五' 之类的标题行不算
+WEEKDAY_LABEL_RE = re.compile(r'(?:星期|周)([一二三四五六日天])')
+TIME_RANGE_RE = re.compile(r'(\d{1,2}:\d{2})\s*[-~－—]\s*(\d{1,2}:\d{2})')
+WEEKDAY_NUMBERS = {'一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '日': 7, '天': 7}
+
+COURSE_FIELDS = ('name', 'teacher', 'week', 'place', 'section')
+CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def expand_week_numbers(week_text):
+    """把 '1-8,10[周]'、'1-15(单)[周]' 之类的周次文本展开成升序的周次元组。"""
+    raw = str(week_text).replace('，', ',').replace(' ', '')
+    odd_only = ('单' in raw)
+    even_only = ('双' in raw)
+    raw = BRACKET_RE.sub('', raw.replace('周', ''))
+    raw = raw.replace('单', '').replace('双', '')
+    week_numbers = set()
+    for item in raw.split(','):
+        if not item:
+            continue
+        if '-' in item:
+            left, right = item.split('-', 1)
+            if left.isdigit() and right.isdigit():
+                week_numbers.update(range(int(left), int(right) + 1))
+        elif item.isdigit():
+            week_numbers.add(int(item))
+    if odd_only:
+        return tuple(w for w in sorted(week_numbers) if w % 2 == 1)
+    if even_only:
+        return tuple(w for w in sorted(week_numbers) if w % 2 == 0)
+    return tuple(sorted(week_numbers))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _parse_cell(cell_info):
+    lines = [line.strip() for line in str(cell_info).splitlines() if line.strip()]
+    courses = []
+    for idx, line in enumerate(lines):
+        if '[周]' not in line or not DIGIT_RE.search(line):
+            continue
+        if idx + 2 >= len(lines):
+            continue
+        place = lines[idx + 1]
+        section = lines[idx + 2]
+        if '节' not in section:
+            continue
+        teacher = lines[idx - 1] if idx - 1 >= 0 else ''
+        name_idx = idx - 2
+        if name_idx >= 0 and COURSE_INDEX_RE.fullmatch(lines[name_idx]):
+            name_idx -= 1
+        if name_idx < 0:
+            continue
+        courses.append((lines[name_idx], teacher, line, place, section))
+    return tuple(courses)
+
+
+def parse_cell_courses(cell_info):
+    """解析课表单元格文本，支持一个单元格中包含多门课(每门一般5行)。"""
+    return [dict(zip(COURSE_FIELDS, course)) for course in _parse_cell(cell_info)]
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def section_sort_key(section_label):
+    nums = tuple(int(x) for x in NUMBER_RE.findall(section_label))
+    return nums if nums else (999,)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def normalize_section(section_text):
+    s = str(section_text).replace('节', '').strip()
+    s = s.strip('[]')
+    return s
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def split_section_slots(section_label):
+    """把节次标签拆成两节一组的格子，如 '01-02-03-04' -> ('01-02', '03-04')。"""
+    nums = [int(x) for x in NUMBER_RE.findall(str(section_label))]
+    if not nums:
+        return (str(section_label),)
+    if len(nums) <= 2:
+        if len(nums) == 1:
+            return (f'{nums[0]:02d}',)
+        return (f'{nums[0]:02d}-{nums[1]:02d}',)
+
+    slots = []
+    i = 0
+    while i < len(nums):
+        if i + 1 < len(nums):
+            slots.append(f'{nums[i]:02d}-{nums[i+1]:02d}')
+            i += 2
+        else:
+            slots.append(f'{nums[i]:02d}')
+            i += 1
+    return tuple(slots)
+
+
+def clear_caches():
+    for fn in (expand_week_numbers, _parse_cell, section_sort_key, normalize_section, split_section_slots):
+        fn.cache_clear()
+
+
+def load_sheet(content: bytes):
+    """直接从响应字节解析课表，不落盘；on_demand 只加载第一个工作表。"""
+    wb = xlrd.open_workbook(file_contents=content, on_demand=True)
+    return wb.sheet_by_index(0)
+
+
+def open_sheet(path):
+    with open(path, 'rb') as f:
+        return load_sheet(f.read())
+
+
+class SheetFormatError(ValueError):
+    """工作表不是可识别的课表版式(找到了节次行却找不到星期列等)。"""
+
+
+class SheetLayout(NamedTuple):
+    """从工作表本身识别出的版式。"""
+    header_row: int  # 星期表头所在行，没有表头时为 -1
+    label_col: int  # 节次/时间所在列
+    weekday_cols: tuple  # ((列, 星期 1-7), ...)
+    section_times: dict  # {行: ('HH:MM', 'HH:MM')}，只包含带时间段的节次行
+
+    @property
+    def section_rows(self):
+        return sorted(self.section_times)
+
+
+def _time_range(text):
+    m = TIME_RANGE_RE.search(text)
+    if m is None:
+        return None
+    return m[1].zfill(5), m[2].zfill(5)  # '8:00' -> '08:00'
+
+
+def detect_layout(ws):
+    """识别表头行、节次行与星期列，不再假定固定的行列范围(周末、更多节次的课表都能解析)。
+
+    表头行是前 HEADER_SCAN_ROWS 行中至少有两个不同的单元格整格为 星期X/周X 的第一行；节次行是节次列里带有
+    'HH:MM-HH:MM' 的行。找不到表头时，节次列右侧的 7 列依次视为周一到周日。
+    有节次行却没有星期列时抛出 SheetFormatError，而不是静默地解析出 0 门课。
+    """
+    header_row, weekday_cols = -1, ()
+    for row in range(min(HEADER_SCAN_ROWS, ws.nrows)):
+        found = []
+        for col, value in enumerate(ws.row_values(row)):
+            m = WEEKDAY_LABEL_RE.fullmatch(value.strip()) if value and isinstance(value, str) else None
+            if m:
+                found.append((col, WEEKDAY_NUMBERS[m.group(1)]))
+        if len({day for _col, day in found}) >= 2:
+            header_row, weekday_cols = row, tuple(found)
+            break
+
+    first_day_col = weekday_cols[0][0] if weekday_cols else ws.ncols
+    section_times, label_col = {}, 0
+    for col in range(max(1, first_day_col)):
+        times = {}
+        for row, value in enumerate(ws.col_values(col, header_row + 1), start=header_row + 1):
+            span = _time_range(value) if isinstance(value, str) else None
+            if span:
+                times[row] = span
+        if times:
+            section_times, label_col = times, col
+            break
+
+    if not weekday_cols:
+        weekday_cols = tuple((col, day) for day, col in enumerate(range(label_col + 1, min(ws.ncols, label_col + 8)), 1))
+    if section_times and not weekday_cols:
+        raise SheetFormatError('找到了节次行，但找不到 星期一..星期日 对应的列')
+    return SheetLayout(header_row, label_col, weekday_cols, section_times)
+
+
+def iter_cell_blocks(ws, combine=True, layout=None):
+    """遍历有内容的课表格子，产出 (星期, 起始行, 结束行, 单元格文本)，按星期、行排序。
+
+    combine 时把同一列中相邻节次行里相同的文本合并成一块。每行只取一次行数据，
+    Python 层只处理非空单元格。
+    """
+    layout = layout or detect_layout(ws)
+    if not layout.weekday_cols:
+        return
+    last_col = max(col for col, _day in layout.weekday_cols) + 1
+    blocks, open_blocks = [], {}
+    prev_row = None
+    for row in layout.section_rows:
+        values = ws.row_values(row, 0, min(last_col, ws.row_len(row)))
+        width = len(values)
+        for col, weekday in layout.weekday_cols:
+            text = values[col] if col < width else ''
+            if not text or not isinstance(text, str) or text.isspace():
+                continue
+            block = open_blocks.get(col)
+            if combine and block is not None and block[2] == prev_row and block[3] == text:
+                block[2] = row
+                continue
+            block = open_blocks[col] = [weekday, row, row, text]
+            blocks.append(block)
+        prev_row = row
+    blocks.sort(key=lambda b: (b[0], b[1]))
+    for weekday, row, end_row, text in blocks:
+        yield weekday, row, end_row, text
+
+
+def has_course_cells(ws, layout=None):
+    """工作表是否有内容却不像空课表：识别不出节次行，或节次行里有非空的课程格子。"""
+    layout = layout or detect_layout(ws)
+    if not layout.section_times:
+        return ws.nrows > 0
+    return next(iter_cell_blocks(ws, False, layout), None) is not None
+
+
+def parse_lessons(ws, combine=True):
+    """把工作表解析成课程片段列表，time 字段形如 '08:00-09:35+1'(时间段+星期，1-7 为周一到周日)。"""
+    layout = detect_layout(ws)
+    all_lesson = []
+    for weekday, row, end_row, cell_info in iter_cell_blocks(ws, combine, layout):
+        time_range = layout.section_times[row][0] + '-' + layout.section_times[end_row][1]
+        for course in _parse_cell(cell_info):
+            lesson = dict(zip(COURSE_FIELDS, course))
+            lesson['time'] = time_range + '+' + str(weekday)
+            all_lesson.append(lesson)
+    return all_lesson
@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import changes, client, export, manifest, parser, sessions, timetable
+from .events import build_events, group_recurring
+
+
+@dataclass
+class OutputPaths:
+    output_dir: Path
+
+    @property
+    def fetched_xls(self):
+        return self.output_dir / 'fetched_kb.xls'
+
+    @property
+    def timetable(self):
+        return self.output_dir / 'timetable.jsonl'
+
+    @property
+    def calendar_ics(self):
+        return self.output_dir / 'calendar.ics'
+
+    @property
+    def direct_txt(self):
+        return self.output_dir / 'direct.txt'
+
+    @property
+    def update_ics(self):
+        return self.output_dir / 'calendar_update.ics'
+
+    @property
+    def events_state(self):
+        return self.output_dir / 'events_state.json'
+
+    @property
+    def manifest(self):
+        return self.output_dir / 'manifest.json'
+
+    @property
+    def chart_md(self):
+        return self.output_dir / 'semester_16week_chart.md'
+
+    @property
+    def chart_csv(self):
+        return self.output_dir / 'semester_16week_chart.csv'
+
+    def exports(self):
+        """由课表生成、记录在 manifest 中的产物。"""
+        return [self.timetable, self.calendar_ics, self.direct_txt, self.update_ics, self.events_state, self.chart_md, self.chart_csv]
+
+
+@dataclass
+class RunResult:
+    paths: OutputPaths
+    xls_size: int = 0
+    lessons: list = field(default_factory=list)
+    events: list = field(default_factory=list)
+    diff: changes.EventDiff = None
+    skipped: bool = False  # 课表与配置都没变，跳过了解析与导出
+    reused_session: bool = False  # 用保存的会话直接抓到了课表，没有重新登录
+
+
+def _noop(stage):
+    pass
+
+
+def _login_and_fetch(options, account, password, session, on_stage, result):
+    """开启 reuse_session 时先用保存的会话直接抓课表，被拒绝才走完整的登录流程。"""
+    store = sessions.SessionStore(options.session_dir, options.session_ttl) if options.reuse_session else None
+    if store is not None and session is None:
+        saved = store.load(account)
+        if saved is not None:
+            on_stage('fetch')
+            try:
+                # 旧会话失效时教务系统直接返回登录页，不必退避重试
+                content = client.fetch_timetable(saved, options.xueqi, retries=0)
+            except client.LoginError:
+                store.discard(account)
+            else:
+                result.reused_session = True
+                store.save(account, saved)
+                return content
+
+    session = client.login(account, password, session=session)
+    on_stage('fetch')
+    content = client.fetch_timetable(session, options.xueqi)
+    if store is not None:
+        store.save(account, session)
+    return content
+
+
+def run(options, account=None, password=None, output_dir=None, session=None, on_stage=_noop, force=False):
+    """登录 -> 抓取 -> 解析 -> 生成事件 -> 导出，返回 RunResult。
+
+    on_stage 在每个阶段开始时以阶段名回调，供 CLI 显示进度。
+    抓到的课表与 manifest.json 记录的一致时跳过后续阶段(result.skipped)，force=True 强制重新生成。
+    课表无法识别时抛出 parser.SheetFormatError，上次的事件状态与 manifest 保持不变。
+    """
+    account = options.account if account is None else account
+    password = options.password if password is None else password
+    paths = OutputPaths(Path(output_dir or options.output_dir))
+    paths.output_dir.mkdir(parents=True, exist_ok=True)
+    result = RunResult(paths)
+
+    on_stage('login')
+    content = _login_and_fetch(options, account, password, session, on_stage, result)
+    result.xls_size = len(content)
+    xls_hash = manifest.sha256_bytes(content)
+    if not force and manifest.is_up_to_date(manifest.load_manifest(paths.manifest), xls_hash, options, paths.output_dir):
+        result.skipped = True
+        on_stage('done')
+        return result
+    paths.fetched_xls.write_bytes(content)
+
+    on_stage('parse')
+    ws = parser.load_sheet(content)
+    result.lessons = parser.parse_lessons(ws, options.combine)
+    if not result.lessons and parser.has_course_cells(ws):
+        # 解析失败不能当成“这学期没课”：否则增量日历会取消全部课程，并覆盖 events_state.json 与 manifest.json
+        raise parser.SheetFormatError('课表中有内容，但没有解析出任何课程；已保留上次的产物')
+
+    on_stage('events')
+    result.events = build_events(result.lessons, options.term_start_date, options.skip_holidays)
+    items = group_recurring(result.events) if options.compact_ics else result.events
+    result.diff = changes.diff_events(items, changes.load_state(paths.events_state))
+
+    on_stage('export')
+    timetable.write_timetable(paths.timetable, result.lessons, result.events, options)
+    export.write_calendar_files(paths.calendar_ics, paths.direct_txt, items)
+    export.write_ics(paths.update_ics, result.diff.updates)
+    export.write_16week_chart(result.events, markdown_path=paths.chart_md, csv_path=paths.chart_csv)
+    changes.save_state(paths.events_state, result.diff.state)
+    manifest.save_manifest(paths.manifest, manifest.build_manifest(xls_hash, options, paths.exports()))
+
+    on_stage('done')
+    return result
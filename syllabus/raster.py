@@ -0,0 +1,551 @@
+"""不依赖 matplotlib 的学期周课表渲染：用 Pillow 直接在位图上画表格。
+
+版式按 generate_weekly_image.draw_vertical_weeks 的尺寸(14 英寸宽、每周约 2.1 英寸高)换算成像素，
+颜色与表头底色来自 syllabus.chart；需要可选依赖 Pillow(pip install Pillow)。
+"""
+import collections
+import functools
+import hashlib
+import json
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from . import chart
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = ImageDraw = ImageFont = None
+
+DEFAULT_DPI = 200
+FIG_WIDTH = 14.0  # 英寸
+WEEK_HEIGHT = 34 / 16
+TABLE_BOX = (0.10, 0.02, 0.99, 0.98)  # 表格在每周面板内的 左/上/右/下 比例
+WEEK_LABEL_X = 0.055
+ROW_LABEL_WIDTH = 0.08  # 节次列占表格宽度的比例
+CELL_FONT_PT = 7.2
+WEEK_FONT_PT = 11
+EDGE_PT = 0.6
+TILE_VERSION = 2  # 改动版式或绘制逻辑时加一，使旧的缓存块失效
+
+# 按顺序尝试的中文字体；也可以用环境变量 SYLLABUS_FONT 或 image_font 配置指定
+FONT_CANDIDATES = [
+    '/System/Library/Fonts/PingFang.ttc',
+    '/System/Library/Fonts/STHeiti Medium.ttc',
+    '/Library/Fonts/Arial Unicode.ttf',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/usr/share/fonts/wqy-microhei/wqy-microhei.ttc',
+    'C:/Windows/Fonts/msyh.ttc',
+    'C:/Windows/Fonts/simhei.ttf',
+]
+
+
+def require_pillow():
+    if Image is None:
+        raise RuntimeError('Pillow 未安装，无法使用 pillow 渲染后端：pip install Pillow')
+
+
+def find_font(font_path=None):
+    for candidate in (font_path, os.environ.get('SYLLABUS_FONT'), *FONT_CANDIDATES):
+        if candidate and Path(candidate).exists():
+            return str(candidate)
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def load_font(size, font_path=None):
+    path = find_font(font_path)
+    if path is not None:
+        return ImageFont.truetype(path, size)
+    # 找不到中文字体时退回 Pillow 自带字体，中文会显示为方框
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def hex_rgb(color):
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+class Layout:
+    """某个 DPI、某个节次行数下一周面板的像素几何，所有周共用。"""
+
+    def __init__(self, section_count, dpi=DEFAULT_DPI, font_path=None):
+        self.dpi = dpi
+        self.width = self.px(FIG_WIDTH)
+        self.week_height = self.px(WEEK_HEIGHT)
+        left, top, right, bottom = TABLE_BOX
+        x0, x1 = round(left * self.width), round(right * self.width)
+        y0, y1 = round(top * self.week_height), round(bottom * self.week_height)
+        rows = section_count + 1
+        self.row_edges = [y0 + round(i * (y1 - y0) / rows) for i in range(rows + 1)]
+        label_w = round(ROW_LABEL_WIDTH * (x1 - x0))
+        self.col_edges = [x0] + [x0 + label_w + round(i * (x1 - x0 - label_w) / 7) for i in range(8)]
+        self.week_label_x = round(WEEK_LABEL_X * self.width)
+        self.edge = max(1, self.px(EDGE_PT / 72))
+        self.pad = max(1, self.px(CELL_FONT_PT / 72) // 3)
+        self.cell_font = load_font(max(6, self.px(CELL_FONT_PT / 72)), font_path)
+        self.week_font = load_font(max(8, self.px(WEEK_FONT_PT / 72)), font_path)
+
+    def px(self, inches):
+        return max(1, round(inches * self.dpi))
+
+    @property
+    def height(self):
+        return self.week_height
+
+    def cell_box(self, row, col):
+        """row 0 为表头，col 0 为节次列。"""
+        return self.col_edges[col], self.row_edges[row], self.col_edges[col + 1], self.row_edges[row + 1]
+
+
+def wrap_text(text, font, width):
+    """按像素宽度逐字折行(课程名没有空格可断，中英文都按字符折)。"""
+    lines = []
+    for paragraph in text.split('\n'):
+        line = ''
+        for ch in paragraph:
+            if line and font.getlength(line + ch) > width:
+                lines.append(line)
+                line = ch.lstrip()
+            else:
+                line += ch
+        lines.append(line)
+    return lines
+
+
+def draw_text(draw, box, text, font, fill, layout, align='left', bold=False):
+    x0, y0, x1, y1 = box
+    lines = wrap_text(text, font, x1 - x0 - 2 * layout.pad)
+    line_h = font.getbbox('国')[3] + layout.pad // 2
+    max_lines = max(1, (y1 - y0) // line_h)
+    lines = lines[:max_lines]
+    top = y0 + ((y1 - y0) - line_h * len(lines)) // 2
+    stroke = max(1, getattr(font, 'size', 0) // 24) if bold else 0
+    for i, line in enumerate(lines):
+        if align == 'center':
+            x = x0 + ((x1 - x0) - font.getlength(line)) / 2
+        else:
+            x = x0 + layout.pad
+        draw.text((x, top + i * line_h), line, font=font, fill=fill, stroke_width=stroke, stroke_fill=fill)
+
+
+def draw_week_label(image, layout, week):
+    font = layout.week_font
+    text = f'第{week}周'
+    w = round(font.getlength(text)) + 2 * layout.pad
+    h = font.getbbox('国')[3] + 2 * layout.pad
+    label = Image.new('RGBA', (w, h), (255, 255, 255, 0))
+    ImageDraw.Draw(label).text(
+        (layout.pad, layout.pad), text, font=font, fill=chart.TEXT_COLOR,
+        stroke_width=max(1, getattr(font, 'size', 0) // 24), stroke_fill=chart.TEXT_COLOR)
+    label = label.rotate(90, expand=True)
+    image.paste(label, (layout.week_label_x - label.width // 2, (layout.height - label.height) // 2), label)
+
+
+def _draw_box(draw, layout, box, fill, text, color, align='left', bold=False):
+    draw.rectangle(box, fill=fill, outline=hex_rgb(chart.EDGE_COLOR), width=layout.edge)
+    if text:
+        draw_text(draw, box, text, layout.cell_font, color, layout, align, bold)
+
+
+def _draw_cell(draw, layout, row, col, fill, text, color, align='left', bold=False):
+    _draw_box(draw, layout, layout.cell_box(row, col), fill, text, color, align, bold)
+
+
+def draw_skeleton(image, layout, week, sections, headers):
+    """画出与学生无关的部分：表头(日期/节假日)、节次列、空白格子与周次标签。"""
+    draw = ImageDraw.Draw(image)
+    _draw_cell(draw, layout, 0, 0, chart.HEADER_FILLS['normal'], '', chart.TEXT_COLOR)
+    for day, (label, day_type) in enumerate(headers, start=1):
+        _draw_cell(draw, layout, 0, day, chart.HEADER_FILLS[day_type], label, chart.TEXT_COLOR, 'center', True)
+    for row, sec in enumerate(sections, start=1):
+        _draw_cell(draw, layout, row, 0, chart.ROW_LABEL_FILL, sec, chart.ROW_LABEL_COLOR, 'center', True)
+        for day in range(1, 8):
+            _draw_cell(draw, layout, row, day, chart.EMPTY_FILL, '', chart.TEXT_COLOR)
+    draw_week_label(image, layout, week)
+
+
+def draw_courses(image, layout, sections, grid, color_map):
+    """在骨架上叠加课程：只重画有课的格子(底色 + 文字)。"""
+    draw = ImageDraw.Draw(image)
+    for row, sec in enumerate(sections, start=1):
+        for day in range(1, 8):
+            texts = chart.cell_texts(grid, sec, day)
+            if texts:
+                _draw_cell(draw, layout, row, day, chart.cell_fill(texts, color_map),
+                           chart.CELL_SEPARATOR.join(texts), chart.TEXT_COLOR)
+
+
+def render_week(layout, week, sections, grid, headers, color_map):
+    """渲染一周的面板，返回 RGB 图像(宽 layout.width、高 layout.height)。"""
+    require_pillow()
+    image = Image.new('RGB', (layout.width, layout.height), chart.EMPTY_FILL)
+    draw_skeleton(image, layout, week, sections, headers)
+    draw_courses(image, layout, sections, grid, color_map)
+    return image
+
+
+@functools.lru_cache(maxsize=8)
+def layout_for(section_count, dpi=DEFAULT_DPI, font_path=None):
+    return Layout(section_count, dpi, font_path)
+
+
+def _render_week_job(job):
+    # 在子进程中执行：只传可 pickle 的数据，字体与版式在每个子进程里各自构建一次
+    dpi, font_path, week, sections, grid, headers, color_map = job
+    layout = layout_for(len(sections), dpi, font_path)
+    image = render_week(layout, week, sections, grid, headers, color_map)
+    return image.size, image.tobytes()
+
+
+def tile_key(*parts):
+    """一周面板的内容哈希：渲染参数、表头和格子内容都相同时，画出来的图也相同。"""
+    payload = json.dumps([TILE_VERSION, parts], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class TileCache:
+    """按内容哈希保存渲染好的周面板(PNG)，课表只改了某几周时只重画这几周。"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path_for(self, key):
+        return self.directory / (key + '.png')
+
+    def get(self, key):
+        try:
+            with Image.open(self.path_for(key)) as image:
+                image.load()
+                return image
+        except (OSError, ValueError):
+            return None
+
+    def has(self, key):
+        return self.path_for(key).exists()
+
+    def put(self, key, image):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path_for(key).with_suffix('.tmp')
+        image.save(tmp, format='PNG')
+        os.replace(tmp, self.path_for(key))
+
+    def retain(self, keys):
+        """删掉本次没有用到的旧块，缓存目录不会无限增长。"""
+        keep = {self.path_for(key).name for key in keys}
+        for path in self.directory.glob('*.png'):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+
+
+def iter_tiles(fn, jobs, keys, workers=1, cache=None, mode='RGB'):
+    """按顺序逐块产出 (面板图像, 是否新渲染)。fn(job) 返回 ((宽, 高), 原始像素)。
+
+    命中缓存的周直接读取，其余渲染后写回缓存；workers > 1 时在进程池里并行渲染，
+    但同时在途的块不超过 workers 个，内存占用只与 workers 和单块大小有关。
+    """
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs))) if workers > 1 and len(jobs) > 1 else None
+
+    def start(idx):
+        if cache is not None and cache.has(keys[idx]):
+            return idx, None
+        return idx, pool.submit(fn, jobs[idx]) if pool is not None else None
+
+    def finish(idx, future):
+        if future is None and cache is not None:
+            tile = cache.get(keys[idx])
+            if tile is not None:
+                return tile, False
+        size, raw = future.result() if future is not None else fn(jobs[idx])
+        tile = Image.frombytes(mode, size, raw)
+        if cache is not None:
+            cache.put(keys[idx], tile)
+        return tile, True
+
+    window = collections.deque()
+    try:
+        for idx in range(len(jobs)):
+            window.append(start(idx))
+            if len(window) >= max(1, workers):
+                yield finish(*window.popleft())
+        while window:
+            yield finish(*window.popleft())
+        if cache is not None:
+            cache.retain(keys)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def render_tiles(fn, jobs, keys, workers=1, cache=None, mode='RGB'):
+    """iter_tiles 的列表版本，返回 (全部面板, 新渲染的块数)。"""
+    tiles, rendered = [], 0
+    for tile, fresh in iter_tiles(fn, jobs, keys, workers, cache, mode):
+        tiles.append(tile)
+        rendered += fresh
+    return tiles, rendered
+
+
+class PngStripWriter:
+    """逐条(自上而下)写入 PNG：每条像素行压缩后立即写盘，整张图从不出现在内存里。
+
+    height 必须事先确定；写完后原子替换目标文件。
+    """
+
+    SIGNATURE = b'\x89PNG\r\n\x1a\n'
+    COLOR_TYPES = {'RGB': (2, 3), 'RGBA': (6, 4)}
+
+    def __init__(self, path, width, height, mode='RGB', dpi=None, level=6):
+        self.path = Path(path)
+        self.width, self.height, self.mode = width, height, mode
+        color_type, self.channels = self.COLOR_TYPES[mode]
+        self.rows = 0
+        self.tmp = self.path.with_name(self.path.name + '.tmp')
+        self.f = open(self.tmp, 'wb')
+        self.f.write(self.SIGNATURE)
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+        if dpi:
+            ppm = round(dpi / 0.0254)
+            self._chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+        self.compressor = zlib.compressobj(level)
+
+    def _chunk(self, kind, data):
+        self.f.write(struct.pack('>I', len(data)) + kind + data)
+        self.f.write(struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write(self, strip):
+        """写入一条宽度为 width 的图像。"""
+        if strip.mode != self.mode:
+            strip = strip.convert(self.mode)
+        if strip.width != self.width or self.rows + strip.height > self.height:
+            raise ValueError('图像条尺寸与 PNG 头不一致')
+        raw = memoryview(strip.tobytes())
+        stride = self.width * self.channels
+        out = []
+        for offset in range(0, len(raw), stride):
+            out.append(self.compressor.compress(b'\0'))  # 每行的过滤方式：None
+            out.append(self.compressor.compress(raw[offset:offset + stride]))
+        data = b''.join(out)
+        if data:
+            self._chunk(b'IDAT', data)
+        self.rows += strip.height
+
+    def close(self):
+        try:
+            if self.rows != self.height:
+                raise ValueError(f'PNG 只写入了 {self.rows}/{self.height} 行')
+            self._chunk(b'IDAT', self.compressor.flush())
+            self._chunk(b'IEND', b'')
+        finally:
+            self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        self.f.close()
+        self.tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def week_tile_path(week_dir, week):
+    return Path(week_dir) / f'week_{week:02d}.png'
+
+
+def write_tiles_png(tiles, out_path, count, dpi=None, weeks=None, week_dir=None):
+    """把 iter_tiles 产出的 count 个等高面板逐块写成一张 PNG，峰值内存约为一块面板。
+
+    给出 week_dir 时同时把每周单独存成 week_XX.png(weeks 为对应的周次)，便于前端按需加载。
+    返回新渲染的块数。
+    """
+    writer = None
+    rendered = 0
+    try:
+        for idx, (tile, fresh) in enumerate(tiles):
+            rendered += fresh
+            if writer is None:
+                writer = PngStripWriter(out_path, tile.width, tile.height * count, 'RGB', dpi)
+            tile = tile.convert('RGB') if tile.mode != 'RGB' else tile
+            writer.write(tile)
+            if week_dir is not None:
+                save_week_tile(tile, week_dir, weeks[idx], dpi)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is not None:
+        writer.close()
+    return rendered
+
+
+def save_week_tile(tile, week_dir, week, dpi=None):
+    Path(week_dir).mkdir(parents=True, exist_ok=True)
+    params = {'dpi': (dpi, dpi)} if dpi else {}
+    tile.save(week_tile_path(week_dir, week), format='PNG', **params)
+
+
+def stitch(tiles, mode='RGB'):
+    """把宽度相同的面板自上而下拼成一张图。"""
+    width = tiles[0].width
+    image = Image.new(mode, (width, sum(tile.height for tile in tiles)), chart.EMPTY_FILL)
+    top = 0
+    for tile in tiles:
+        image.paste(tile, (0, top))
+        top += tile.height
+    return image
+
+
+def week_jobs(sections, per_week, term_start, dpi=DEFAULT_DPI, font_path=None):
+    color_map = chart.course_color_map(per_week)
+    jobs = [
+        (dpi, font_path, week, tuple(sections), per_week[week], chart.day_headers(term_start, week), color_map)
+        for week in sorted(per_week)
+    ]
+    keys = [tile_key('pillow', dpi, find_font(font_path), week, sections, grid_items(grid), headers,
+                     chart.grid_colors(grid, color_map))
+            for dpi, font_path, week, sections, grid, headers, color_map in jobs]
+    return jobs, keys
+
+
+def grid_items(grid):
+    """格子内容的规范形式(去重、排序)，用于计算缓存哈希。"""
+    return sorted((key, sorted(set(texts))) for key, texts in grid.items() if texts)
+
+
+def _render_weeks(sections, per_week, term_start, dpi, font_path, workers, cache_dir):
+    require_pillow()
+    jobs, keys = week_jobs(sections, per_week, term_start, dpi, font_path)
+    cache = TileCache(cache_dir) if cache_dir else None
+    tiles, rendered = render_tiles(_render_week_job, jobs, keys, workers, cache)
+    return stitch(tiles), rendered
+
+
+def render_weeks(sections, per_week, term_start, dpi=DEFAULT_DPI, font_path=None, workers=1, cache_dir=None):
+    """把所有周的面板自上而下拼成一张图；各周互不依赖，workers > 1 时按周分给多个进程渲染。
+
+    给出 cache_dir 时按内容哈希缓存每周的面板，只重画内容变化的周。
+    """
+    return _render_weeks(sections, per_week, term_start, dpi, font_path, workers, cache_dir)[0]
+
+
+def save_weeks_png(sections, per_week, term_start, out_path, dpi=DEFAULT_DPI, font_path=None, workers=1,
+                   cache_dir=None, tiled=False, week_dir=None):
+    """写出 PNG，返回实际重新渲染的周数(其余来自缓存)。
+
+    tiled 为 True 时逐周渲染、逐周编码写盘，不在内存里拼整张图，高 DPI 下峰值内存只有一周面板大小；
+    week_dir 不为空时另外把每周存成 week_XX.png。
+    """
+    if tiled:
+        require_pillow()
+        jobs, keys = week_jobs(sections, per_week, term_start, dpi, font_path)
+        cache = TileCache(cache_dir) if cache_dir else None
+        tiles = iter_tiles(_render_week_job, jobs, keys, workers, cache)
+        return write_tiles_png(tiles, out_path, len(jobs), dpi, sorted(per_week), week_dir)
+
+    image, rendered = _render_weeks(sections, per_week, term_start, dpi, font_path, workers, cache_dir)
+    image.save(out_path, format='PNG', dpi=(dpi, dpi))
+    if week_dir is not None:
+        layout = layout_for(len(sections), dpi, font_path)
+        for idx, week in enumerate(sorted(per_week)):
+            tile = image.crop((0, idx * layout.height, layout.width, (idx + 1) * layout.height))
+            save_week_tile(tile, week_dir, week, dpi)
+    return rendered
+
+
+class TermTemplate:
+    """批量出图用的学期模板：骨架只画一次，之后每个学生只复制骨架并叠加自己的课程。
+
+    骨架包括表头日期、节假日/周末底色、节次列、网格线和周次标签，同一学期所有学生都相同。
+    给出 sections 时所有学生使用同一组节次行(图片尺寸一致，每周的骨架只画一次)；
+    否则按每个学生自己的节次行分别缓存骨架。画好的课程格子也会缓存，同一门课在不同周、
+    不同学生之间只画一次。
+    """
+
+    MAX_SKELETONS = 256  # 缓存的骨架面板上限
+    MAX_CELLS = 4096  # 缓存的课程格子上限
+
+    def __init__(self, term_start, dpi=DEFAULT_DPI, font_path=None, sections=None):
+        require_pillow()
+        self.term_start = term_start
+        self.dpi = dpi
+        self.font_path = font_path
+        self.sections = tuple(sections) if sections is not None else None
+        self._headers = {}
+        self._skeletons = {}
+        self._cells = {}
+
+    def headers(self, week):
+        if week not in self._headers:
+            self._headers[week] = chart.day_headers(self.term_start, week)
+        return self._headers[week]
+
+    def layout(self, sections):
+        return layout_for(len(sections), self.dpi, self.font_path)
+
+    def skeleton(self, sections, week):
+        key = (tuple(sections), week)
+        image = self._skeletons.get(key)
+        if image is None:
+            if len(self._skeletons) >= self.MAX_SKELETONS:
+                self._skeletons.clear()
+            layout = self.layout(sections)
+            image = Image.new('RGB', (layout.width, layout.height), chart.EMPTY_FILL)
+            draw_skeleton(image, layout, week, key[0], self.headers(week))
+            self._skeletons[key] = image
+        return image
+
+    def course_cell(self, layout, box, fill, text):
+        """画好的单个课程格子(含边框)，按 (尺寸, 底色, 文字) 缓存。"""
+        x0, y0, x1, y1 = box
+        key = (layout.dpi, x1 - x0, y1 - y0, fill, text)
+        tile = self._cells.get(key)
+        if tile is None:
+            if len(self._cells) >= self.MAX_CELLS:
+                self._cells.clear()
+            tile = Image.new('RGB', (x1 - x0 + 1, y1 - y0 + 1), fill)
+            _draw_box(ImageDraw.Draw(tile), layout, (0, 0, x1 - x0, y1 - y0), fill, text, chart.TEXT_COLOR)
+            self._cells[key] = tile
+        return tile
+
+    def render_week(self, sections, week, grid, color_map):
+        sections = self.sections or tuple(sections)
+        layout = self.layout(sections)
+        image = self.skeleton(sections, week).copy()
+        for row, sec in enumerate(sections, start=1):
+            for day in range(1, 8):
+                texts = chart.cell_texts(grid, sec, day)
+                if texts:
+                    box = layout.cell_box(row, day)
+                    fill = chart.cell_fill(texts, color_map)
+                    image.paste(self.course_cell(layout, box, fill, chart.CELL_SEPARATOR.join(texts)), box[:2])
+        return image
+
+    def iter_weeks(self, sections, per_week):
+        """按周次顺序产出 (面板, True)，可以直接交给 write_tiles_png。"""
+        color_map = chart.course_color_map(per_week)
+        for week in sorted(per_week):
+            yield self.render_week(sections, week, per_week[week], color_map), True
+
+    def render(self, sections, per_week):
+        return stitch([tile for tile, _ in self.iter_weeks(sections, per_week)])
+
+    def save_png(self, sections, per_week, out_path, tiled=False):
+        if tiled:
+            write_tiles_png(self.iter_weeks(sections, per_week), out_path, len(per_week), self.dpi)
+        else:
+            self.render(sections, per_week).save(out_path, format='PNG', dpi=(self.dpi, self.dpi))
@@ -0,0 +1,79 @@
+"""按账号保存登录后的 cookie，下次运行先用旧会话直接抓课表，被拒绝时才重新登录。
+
+只适合账号持有者自己运行的脚本/批处理：旧会话不会再校验密码，所以后端接口不要开启。
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from requests.cookies import create_cookie
+
+from .client import new_session
+
+SESSION_VERSION = 2
+DEFAULT_TTL = 1800  # 教务系统的会话 cookie 没有过期时间，按服务端常见的 30 分钟闲置超时估计
+
+
+def account_hash(account):
+    # 文件名与文件内容都只记录学号的哈希，会话目录里不出现明文学号
+    return hashlib.sha256(str(account).encode('utf-8')).hexdigest()
+
+
+class SessionStore:
+    def __init__(self, directory, ttl: float = DEFAULT_TTL):
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+    def path_for(self, account):
+        return self.directory / (account_hash(account)[:16] + '.json')
+
+    def load(self, account):
+        """返回恢复了 cookie 的 session；没有保存过或已过期时返回 None。"""
+        path = self.path_for(account)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != SESSION_VERSION or data.get('account_hash') != account_hash(account):
+            return None
+        if data.get('expires_at', 0) <= time.time():
+            self.discard(account)
+            return None
+
+        session = new_session()
+        for c in data.get('cookies', []):
+            session.cookies.set_cookie(create_cookie(
+                c['name'], c['value'], domain=c.get('domain', ''), path=c.get('path', '/'),
+                expires=c.get('expires'), secure=c.get('secure', False),
+            ))
+        return session
+
+    def save(self, account, session):
+        now = time.time()
+        cookies = [
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'expires': c.expires, 'secure': c.secure}
+            for c in session.cookies
+        ]
+        expires_at = min([now + self.ttl] + [c['expires'] for c in cookies if c['expires']])
+        data = {
+            'version': SESSION_VERSION, 'account_hash': account_hash(account), 'saved_at': now,
+            'expires_at': expires_at, 'cookies': cookies,
+        }
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(account)
+        tmp = path.with_suffix('.tmp')
+        # cookie 等同于登录凭据，只允许当前用户读写
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def discard(self, account):
+        try:
+            os.remove(self.path_for(account))
+        except OSError:
+            pass
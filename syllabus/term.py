@@ -0,0 +1,70 @@
+"""学期日历：(周次, 星期) -> 日期/节假日/调休 的查表，每个学期起始日期只构建一次。
+
+节假日数据来自可选依赖 chinese_calendar(pip install chinese-calendar)，未安装或年份超出其数据范围时视为没有节假日。
+"""
+import datetime
+import functools
+from typing import NamedTuple, Optional
+
+try:
+    import chinese_calendar as cc
+except ImportError:
+    cc = None
+
+DEFAULT_WEEKS = 20
+
+
+class TermDay(NamedTuple):
+    date: datetime.date
+    ymd: str  # 20260302，ICS 使用
+    label: str  # 03/02，图表使用
+    is_weekend: bool
+    holiday_name: Optional[str]  # 法定节假日名称
+    is_makeup_workday: bool  # 调休上班的周末
+
+    @property
+    def is_holiday(self):
+        return self.holiday_name is not None
+
+
+def _holiday_info(d):
+    if cc is None:
+        return None, False
+    try:
+        is_holiday, name = cc.get_holiday_detail(d)
+        is_workday = cc.is_workday(d)
+    except NotImplementedError:
+        return None, False
+    holiday_name = str(getattr(name, 'value', name)) if is_holiday and name else None
+    return holiday_name, (d.weekday() >= 5 and is_workday)
+
+
+def _make_day(term_start, week, weekday):
+    d = term_start + datetime.timedelta(days=(week - 1) * 7 + (weekday - 1))
+    holiday_name, makeup = _holiday_info(d)
+    return TermDay(d, d.strftime('%Y%m%d'), d.strftime('%m/%d'), d.weekday() >= 5, holiday_name, makeup)
+
+
+class TermCalendar:
+    def __init__(self, term_start: datetime.date, weeks: int = DEFAULT_WEEKS):
+        self.term_start = term_start
+        self.days = {
+            (week, weekday): _make_day(term_start, week, weekday)
+            for week in range(1, weeks + 1)
+            for weekday in range(1, 8)
+        }
+
+    def day(self, week, weekday):
+        info = self.days.get((week, weekday))
+        if info is None:
+            # 超出预建范围的周次(或第 0 周之类的异常值)按需补算
+            info = self.days[(week, weekday)] = _make_day(self.term_start, week, weekday)
+        return info
+
+    def week(self, week):
+        return [self.day(week, weekday) for weekday in range(1, 8)]
+
+
+@functools.lru_cache(maxsize=16)
+def term_calendar(term_start: datetime.date, weeks: int = DEFAULT_WEEKS):
+    return TermCalendar(term_start, weeks)
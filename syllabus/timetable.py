@@ -0,0 +1,55 @@
+"""解析结果的中间文件(JSON lines)。
+
+process.py 解析完课表后写出 timetable.jsonl，generate_weekly_image.py 等下游直接读取，不必再用 xlrd 打开和解析 xls。
+第一行是文件头 {"format": ..., "version": ..., 配置}，之后每行一条 {"type": "lesson" | "event", ...}。
+"""
+import json
+
+TIMETABLE_FORMAT = 'bupt-syllabus-timetable'
+TIMETABLE_VERSION = 1
+
+
+class TimetableFormatError(ValueError):
+    """中间文件不存在、损坏或版本不兼容。"""
+
+
+def write_timetable(path, lessons, events, options):
+    header = {
+        'format': TIMETABLE_FORMAT,
+        'version': TIMETABLE_VERSION,
+        'xueqi': options.xueqi,
+        'term_start_date': options.term_start_date.isoformat(),
+        'Combine_Trigger': options.combine,
+        'skip_holidays': options.skip_holidays,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(header, ensure_ascii=False) + '\n')
+        for l in lessons:
+            f.write(json.dumps(dict(l, type='lesson'), ensure_ascii=False) + '\n')
+        for e in events:
+            f.write(json.dumps(dict(e, type='event'), ensure_ascii=False) + '\n')
+
+
+def load_timetable(path):
+    """返回 (header, lessons, events)。"""
+    try:
+        f = open(path, encoding='utf-8')
+    except OSError as e:
+        raise TimetableFormatError(f'无法读取 {path}: {e}') from e
+    with f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError as e:
+            raise TimetableFormatError(f'{path} 文件头损坏') from e
+        if header.get('format') != TIMETABLE_FORMAT or header.get('version') != TIMETABLE_VERSION:
+            raise TimetableFormatError(f'{path} 版本不兼容: {header.get("version")}')
+
+        lessons, events = [], []
+        for line in f:
+            record = json.loads(line)
+            kind = record.pop('type', None)
+            if kind == 'lesson':
+                lessons.append(record)
+            elif kind == 'event':
+                events.append(record)
+    return header, lessons, events
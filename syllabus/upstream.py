@@ -0,0 +1,191 @@
+"""访问教务系统(jwgl.bupt.edu.cn)的统一出口：令牌桶限速、并发上限、带抖动的退避重试与熔断。
+
+同一进程内的 CLI 批处理、Django 视图与后台任务共用一个 UpstreamClient，用 configure() / configure_from_options()
+调整参数，status() 用于监控。
+"""
+import random
+import threading
+import time
+
+import requests
+
+
+class UpstreamUnavailable(Exception):
+    """教务系统不可用：熔断器已打开，或重试后仍然失败。"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """取一个令牌，不够时阻塞到令牌补充为止。"""
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def available(self):
+        with self.lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def before_request(self):
+        """熔断打开时直接失败；冷却期过后只放行一个探测请求(half_open)。"""
+        with self.lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise UpstreamUnavailable('教务系统暂时不可用(熔断中)')
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self.probe_in_flight:
+                    raise UpstreamUnavailable('教务系统暂时不可用(正在探测恢复)')
+                self.probe_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+    def snapshot(self):
+        with self.lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {'state': self.state, 'failures': self.failures, 'retry_in': retry_in}
+
+
+class UpstreamClient:
+    def __init__(self, rate=5.0, burst=10, max_concurrency=16, retries=2, backoff=0.5, max_backoff=5.0,
+                 timeout=15.0, failure_threshold=5, reset_timeout=30.0):
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_concurrency = max_concurrency
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.in_flight = 0
+        self.counter_lock = threading.Lock()
+        self.counters = {'requests': 0, 'retries': 0, 'failures': 0, 'rejected': 0}
+
+    def _count(self, name, delta=1):
+        with self.counter_lock:
+            self.counters[name] += delta
+
+    def backoff_delay(self, attempt):
+        # full jitter：在 [0, min(上限, base * 2^attempt)] 内随机，避免大量 worker 同时重试
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def request(self, session, method, url, **kwargs):
+        """经过限速、并发控制与熔断发出请求；网络错误和 5xx 会重试，最终失败抛出 UpstreamUnavailable。"""
+        kwargs.setdefault('timeout', self.timeout)
+        error = None
+        for attempt in range(self.retries + 1):
+            try:
+                self.breaker.before_request()
+            except UpstreamUnavailable:
+                self._count('rejected')
+                raise
+            self.bucket.acquire()
+            with self.semaphore:
+                self._count('requests')
+                with self.counter_lock:
+                    self.in_flight += 1
+                try:
+                    resp = session.request(method, url, **kwargs)
+                except requests.RequestException as e:
+                    error = e
+                else:
+                    if resp.status_code < 500:
+                        self.breaker.record_success()
+                        return resp
+                    error = requests.HTTPError(f'HTTP {resp.status_code}', response=resp)
+                finally:
+                    with self.counter_lock:
+                        self.in_flight -= 1
+            self._count('failures')
+            self.breaker.record_failure()
+            if attempt < self.retries:
+                self._count('retries')
+                time.sleep(self.backoff_delay(attempt))
+        raise UpstreamUnavailable(f'请求教务系统失败: {error}') from error
+
+    def status(self):
+        with self.counter_lock:
+            counters = dict(self.counters, in_flight=self.in_flight)
+        return {
+            'circuit': self.breaker.snapshot(),
+            'tokens': round(self.bucket.available(), 2),
+            'max_concurrency': self.max_concurrency,
+            **counters,
+        }
+
+
+_client = UpstreamClient()
+
+
+def configure(**kwargs):
+    """用新参数替换进程内共享的 UpstreamClient(参数见 UpstreamClient)。"""
+    global _client
+    _client = UpstreamClient(**kwargs)
+    return _client
+
+
+def configure_from_options(options, workers=1):
+    """按 Options 的 upstream_* 配置共享客户端(CLI 与批处理使用，Django 读取 settings.SYLLABUS_UPSTREAM)。
+
+    突发容量与并发上限至少为 workers，保证每个并发账号都能立即发出请求。
+    """
+    return configure(
+        rate=options.upstream_rate,
+        burst=max(options.upstream_burst, workers),
+        max_concurrency=max(options.upstream_concurrency, workers),
+    )
+
+
+def request(session, method, url, **kwargs):
+    return _client.request(session, method, url, **kwargs)
+
+
+def status():
+    return _client.status()
@@ -0,0 +1,147 @@
+"""学期周课表的 SVG / 自包含 HTML 导出，不依赖 matplotlib 或 Pillow。
+
+版式与 syllabus.raster 相同(每英寸 100 个用户单位)，矢量图在手机上可以任意缩放，体积只有几十 KB。
+HTML 里每周是一段独立的内联 SVG，浏览器可以边下载边显示。
+"""
+from html import escape
+
+from . import chart
+
+UNIT = 100  # 每英寸的 SVG 用户单位
+WIDTH = 14.0 * UNIT
+WEEK_HEIGHT = 34 / 16 * UNIT
+TABLE_BOX = (0.10, 0.02, 0.99, 0.98)
+WEEK_LABEL_X = 0.055
+ROW_LABEL_WIDTH = 0.08
+CELL_FONT = 7.2 / 72 * UNIT
+WEEK_FONT = 11 / 72 * UNIT
+EDGE = 0.6 / 72 * UNIT
+PAD = CELL_FONT / 3
+FONT_FAMILY = "'PingFang SC', 'Hiragino Sans GB', 'Microsoft YaHei', 'Noto Sans CJK SC', 'Heiti SC', sans-serif"
+
+
+def text_width(text, size):
+    # 没有字体度量，按全角字符 1 个字号宽、半角 0.55 个字号宽估算，用于折行
+    return sum(size if ord(ch) > 0x2E7F else size * 0.55 for ch in text)
+
+
+def wrap_text(text, size, width):
+    lines = []
+    for paragraph in text.split('\n'):
+        line = ''
+        for ch in paragraph:
+            if line and text_width(line + ch, size) > width:
+                lines.append(line)
+                line = ch.lstrip()
+            else:
+                line += ch
+        lines.append(line)
+    return lines
+
+
+def _num(value):
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
+
+
+def cell_svg(x0, y0, x1, y1, fill, text='', color=chart.TEXT_COLOR, align='left', bold=False):
+    parts = [f'<rect x="{_num(x0)}" y="{_num(y0)}" width="{_num(x1 - x0)}" height="{_num(y1 - y0)}" fill="{fill}"/>']
+    if text:
+        line_h = CELL_FONT * 1.25
+        lines = wrap_text(text, CELL_FONT, x1 - x0 - 2 * PAD)[:max(1, int((y1 - y0) // line_h))]
+        top = y0 + ((y1 - y0) - line_h * len(lines)) / 2 + CELL_FONT
+        if align == 'center':
+            x, anchor = (x0 + x1) / 2, 'middle'
+        else:
+            x, anchor = x0 + PAD, 'start'
+        weight = ' font-weight="bold"' if bold else ''
+        # 嵌套 svg 负责把溢出的文字裁掉，效果同 matplotlib 表格的单元格
+        parts.append(
+            f'<svg x="{_num(x0)}" y="{_num(y0)}" width="{_num(x1 - x0)}" height="{_num(y1 - y0)}" overflow="hidden">'
+            f'<text fill="{color}" text-anchor="{anchor}"{weight}>'
+        )
+        for i, line in enumerate(lines):
+            parts.append(f'<tspan x="{_num(x - x0)}" y="{_num(top - y0 + i * line_h)}">{escape(line)}</tspan>')
+        parts.append('</text></svg>')
+    return ''.join(parts)
+
+
+def week_svg(week, sections, grid, headers, color_map):
+    """一周面板的 SVG 片段(原点在面板左上角)。"""
+    left, top, right, bottom = TABLE_BOX
+    x0, x1 = left * WIDTH, right * WIDTH
+    y0, y1 = top * WEEK_HEIGHT, bottom * WEEK_HEIGHT
+    rows = len(sections) + 1
+    row_edges = [y0 + i * (y1 - y0) / rows for i in range(rows + 1)]
+    label_w = ROW_LABEL_WIDTH * (x1 - x0)
+    col_edges = [x0] + [x0 + label_w + i * (x1 - x0 - label_w) / 7 for i in range(8)]
+
+    def box(row, col):
+        return col_edges[col], row_edges[row], col_edges[col + 1], row_edges[row + 1]
+
+    parts = [cell_svg(*box(0, 0), chart.HEADER_FILLS['normal'])]
+    for day, (label, day_type) in enumerate(headers, start=1):
+        parts.append(cell_svg(*box(0, day), chart.HEADER_FILLS[day_type], label, align='center', bold=True))
+    for row, sec in enumerate(sections, start=1):
+        parts.append(cell_svg(*box(row, 0), chart.ROW_LABEL_FILL, sec, chart.ROW_LABEL_COLOR, 'center', True))
+        for day in range(1, 8):
+            texts = chart.cell_texts(grid, sec, day)
+            parts.append(cell_svg(*box(row, day), chart.cell_fill(texts, color_map), chart.CELL_SEPARATOR.join(texts)))
+
+    # 网格线单独画一遍，避免相邻单元格的描边重叠出深浅不一
+    lines = [f'M{_num(x0)} {_num(y)}H{_num(x1)}' for y in row_edges]
+    lines += [f'M{_num(x)} {_num(y0)}V{_num(y1)}' for x in col_edges]
+    parts.append(f'<path d="{"".join(lines)}" stroke="{chart.EDGE_COLOR}" stroke-width="{_num(EDGE)}" fill="none"/>')
+
+    cx, cy = WEEK_LABEL_X * WIDTH, WEEK_HEIGHT / 2
+    parts.append(
+        f'<text x="{_num(cx)}" y="{_num(cy)}" font-size="{_num(WEEK_FONT)}" font-weight="bold" fill="{chart.TEXT_COLOR}" '
+        f'text-anchor="middle" dominant-baseline="central" transform="rotate(-90 {_num(cx)} {_num(cy)})">第{week}周</text>'
+    )
+    return ''.join(parts)
+
+
+def _svg_open(height):
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_num(WIDTH)} {_num(height)}" '
+        f'width="{_num(WIDTH)}" height="{_num(height)}" font-family="{escape(FONT_FAMILY)}" font-size="{_num(CELL_FONT)}">'
+        f'<rect width="100%" height="100%" fill="{chart.EMPTY_FILL}"/>'
+    )
+
+
+def _weeks(sections, per_week, term_start):
+    color_map = chart.course_color_map(per_week)
+    for week in sorted(per_week):
+        yield week, week_svg(week, sections, per_week[week], chart.day_headers(term_start, week), color_map)
+
+
+def iter_svg(sections, per_week, term_start):
+    """逐周产出一张完整 SVG 的文本片段，各周自上而下排列。"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield _svg_open(WEEK_HEIGHT * len(per_week))
+    for idx, (_week, body) in enumerate(_weeks(sections, per_week, term_start)):
+        yield f'<g transform="translate(0 {_num(idx * WEEK_HEIGHT)})">{body}</g>'
+    yield '</svg>\n'
+
+
+def iter_html(sections, per_week, term_start, title='学期课表'):
+    """自包含的 HTML 页面：每周一段内联 SVG，宽度随屏幕缩放。"""
+    yield (
+        '<!DOCTYPE html>\n<html lang="zh-CN"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f'<title>{escape(title)}</title>'
+        '<style>body{margin:0;background:#FFFFFF}section svg{display:block;width:100%;height:auto}</style>'
+        '</head><body>\n'
+    )
+    for week, body in _weeks(sections, per_week, term_start):
+        yield f'<section id="week-{week}">{_svg_open(WEEK_HEIGHT)}{body}</svg></section>\n'
+    yield '</body></html>\n'
+
+
+def write_svg(path, sections, per_week, term_start):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(iter_svg(sections, per_week, term_start))
+
+
+def write_html(path, sections, per_week, term_start, title='学期课表'):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(iter_html(sections, per_week, term_start, title))
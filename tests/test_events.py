@@ -0,0 +1,38 @@
+import datetime
+
+import pytest
+
+import syllabus
+
+TERM_START = datetime.date(2026, 3, 2)
+
+
+def lesson(place, week):
+    return {'name': '数据挖掘', 'teacher': '张三', 'week': week, 'place': place, 'section': '[01-02节]',
+            'time': '08:00-09:35+1'}
+
+
+@pytest.fixture
+def events():
+    # 期中换教室：1-8 周在 教3-101，9-16 周在 教4-202
+    return syllabus.build_events([lesson('教3-101', '1-8[周]'), lesson('教4-202', '9-16[周]')], TERM_START)
+
+
+def test_room_change_splits_into_groups_with_distinct_uids(events):
+    groups = sorted(syllabus.group_recurring(events), key=lambda g: g['week_num'])
+    assert [g['place'] for g in groups] == ['教3-101', '教4-202']
+    assert [g['weeks'] for g in groups] == [list(range(1, 9)), list(range(9, 17))]
+    assert groups[0]['uid'] != groups[1]['uid']
+
+
+def test_group_uids_are_stable_across_runs(events):
+    again = syllabus.build_events([lesson('教3-101', '1-8[周]'), lesson('教4-202', '9-16[周]')], TERM_START)
+    assert [g['uid'] for g in syllabus.group_recurring(events)] == [g['uid'] for g in syllabus.group_recurring(again)]
+
+
+def test_diff_keeps_both_groups_and_rerun_is_unchanged(events):
+    diff = syllabus.diff_events(syllabus.group_recurring(events), {})
+    assert (len(diff.added), len(diff.changed), len(diff.state)) == (2, 0, 2)
+
+    rerun = syllabus.diff_events(syllabus.group_recurring(events), diff.state)
+    assert (len(rerun.added), len(rerun.changed), len(rerun.cancelled), rerun.unchanged) == (0, 0, 0, 2)
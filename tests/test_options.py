@@ -0,0 +1,17 @@
+import datetime
+import types
+
+import syllabus
+
+
+def test_invalid_term_start_falls_back_silently(capsys):
+    options = syllabus.load_options(types.SimpleNamespace(term_start_date='3月2日', year='2026', begin_week=10))
+    assert options.term_start_date == datetime.date(2026, 3, 2)
+    assert '旧规则' in options.term_start_note
+    assert capsys.readouterr().out == ''
+
+
+def test_valid_term_start_has_no_note():
+    options = syllabus.load_options(types.SimpleNamespace(term_start_date='2026-09-07'))
+    assert options.term_start_date == datetime.date(2026, 9, 7)
+    assert options.term_start_note is None
@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+import syllabus
+
+xlwt = pytest.importorskip('xlwt')
+
+COURSE = '数据挖掘\n张三\n1-16[周]\n教3-101\n[01-02节]'
+WEEKDAYS = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+TIMES = ['第1节\n08:00-08:45', '第2节\n08:50-09:35', '第3节\n09:50-10:35']
+
+
+def make_xls(title_rows=(), header=WEEKDAYS, cells=None):
+    """title_rows 写在表头之前；cells 为 {(节次下标, 星期 1-7): 文本}。"""
+    wb = xlwt.Workbook(encoding='utf-8')
+    ws = wb.add_sheet('课表')
+    row = 0
+    for title in title_rows:
+        ws.write(row, 0, title)
+        row += 1
+    if header is not None:
+        ws.write(row, 0, '节次')
+        for col, label in enumerate(header, start=1):
+            ws.write(row, col, label)
+        row += 1
+    for idx, label in enumerate(TIMES):
+        ws.write(row + idx, 0, label)
+    for (idx, day), text in (cells or {}).items():
+        ws.write(row + idx, day, text)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def make_sheet(**kwargs):
+    return syllabus.load_sheet(make_xls(**kwargs))
+
+
+@pytest.mark.parametrize('title', ['姓名:周天宇', '周一至周五', '北京邮电大学 学生个人课表'])
+def test_title_rows_are_not_taken_as_header(title):
+    ws = make_sheet(title_rows=[title, '学号:2025000001'], cells={(0, 1): COURSE, (0, 6): COURSE})
+    layout = syllabus.detect_layout(ws)
+    assert layout.header_row == 2
+    assert layout.weekday_cols == tuple((col, col) for col in range(1, 8))
+    assert sorted(l['time'] for l in syllabus.parse_lessons(ws)) == ['08:00-08:45+1', '08:00-08:45+6']
+
+
+def test_header_cells_may_use_short_names_and_padding():
+    ws = make_sheet(header=[' 周一 ', '周二', '周三', '周四', '周五', '周六', '周日'], cells={(1, 7): COURSE})
+    lessons = syllabus.parse_lessons(ws)
+    assert [l['time'] for l in lessons] == ['08:50-09:35+7']
+
+
+def test_combine_merges_adjacent_identical_cells():
+    ws = make_sheet(cells={(0, 2): COURSE, (1, 2): COURSE})
+    assert [l['time'] for l in syllabus.parse_lessons(ws, combine=True)] == ['08:00-09:35+2']
+    assert [l['time'] for l in syllabus.parse_lessons(ws, combine=False)] == ['08:00-08:45+2', '08:50-09:35+2']
+
+
+def test_missing_header_falls_back_to_columns_after_labels():
+    ws = make_sheet(title_rows=['周一至周五'], header=None, cells={(2, 3): COURSE})
+    assert [l['time'] for l in syllabus.parse_lessons(ws)] == ['09:50-10:35+3']
+
+
+def test_section_rows_without_weekday_columns_raise():
+    wb = xlwt.Workbook(encoding='utf-8')
+    ws = wb.add_sheet('课表')
+    for idx, label in enumerate(TIMES):
+        ws.write(idx, 0, label)
+    buf = io.BytesIO()
+    wb.save(buf)
+    with pytest.raises(syllabus.SheetFormatError):
+        syllabus.parse_lessons(syllabus.load_sheet(buf.getvalue()))
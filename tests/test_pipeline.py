@@ -0,0 +1,36 @@
+import datetime
+
+import pytest
+
+import syllabus
+from syllabus import pipeline
+
+from .test_parser import COURSE, make_xls
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    options = syllabus.load_options(user_config=object(), output_dir=tmp_path,
+                                    term_start_date=datetime.date(2026, 3, 2))
+
+    def run_with(content):
+        monkeypatch.setattr(pipeline, '_login_and_fetch', lambda *args: content)
+        return syllabus.run(options, 'u', 'p')
+    return run_with
+
+
+def test_unparseable_sheet_keeps_previous_state(run, tmp_path):
+    first = run(make_xls(cells={(0, 1): COURSE}))
+    assert len(first.events) == 16
+    paths = first.paths
+    state, manifest = paths.events_state.read_bytes(), paths.manifest.read_bytes()
+
+    with pytest.raises(syllabus.SheetFormatError):
+        run(make_xls(cells={(0, 1): '数据挖掘 调课通知'}))
+    assert paths.events_state.read_bytes() == state
+    assert paths.manifest.read_bytes() == manifest
+
+
+def test_sheet_without_courses_is_an_empty_term(run):
+    result = run(make_xls())
+    assert result.lessons == [] and result.events == []
@@ -0,0 +1,17 @@
+from syllabus import client
+from syllabus.sessions import SessionStore
+
+
+def test_saved_session_does_not_contain_the_account(tmp_path):
+    store = SessionStore(tmp_path)
+    session = client.new_session()
+    session.cookies.set('JSESSIONID', 'abc', domain='jwgl.bupt.edu.cn', path='/jsxsd')
+    store.save('2025000001', session)
+
+    [path] = tmp_path.glob('*.json')
+    assert '2025000001' not in path.name
+    assert '2025000001' not in path.read_text(encoding='utf-8')
+
+    restored = store.load('2025000001')
+    assert restored.cookies.get('JSESSIONID') == 'abc'
+    assert store.load('2025000002') is None
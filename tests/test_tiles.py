@@ -0,0 +1,28 @@
+import datetime
+
+from syllabus import chart, raster
+
+TERM_START = datetime.date(2026, 3, 2)
+
+
+def per_week(extra=None):
+    weeks = {week: {('01-02', 1): ['数据挖掘[中] 教3-101'], ('03-04', 2): ['羽毛球[中] 体育馆']} for week in range(1, 17)}
+    for week, cell, text in extra or ():
+        weeks[week].setdefault(cell, []).append(text)
+    return weeks
+
+
+def test_grid_colors_only_covers_courses_in_that_week():
+    weeks = per_week([(5, ('05-06', 3), '神经网络与深度学习[中] 教4-202')])
+    color_map = chart.course_color_map(weeks)
+    assert set(chart.grid_colors(weeks[1], color_map)) == {'数据挖掘[中]', '羽毛球[中]'}
+    assert set(chart.grid_colors(weeks[5], color_map)) == set(color_map)
+
+
+def test_adding_a_course_only_changes_the_affected_week_keys():
+    sections = ['01-02', '03-04', '05-06']
+    _jobs, before = raster.week_jobs(sections, per_week(), TERM_START)
+    # 名字排在最后的课程不改变其他课程的配色，只有第 5 周的面板需要重画
+    _jobs, after = raster.week_jobs(sections, per_week([(5, ('05-06', 3), '高等数学[中] 教1-101')]), TERM_START)
+    changed = [week for week, (a, b) in enumerate(zip(before, after), start=1) if a != b]
+    assert changed == [5]